@@ -1,3 +1,4 @@
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 from typing import Optional
 import os
@@ -6,10 +7,22 @@ class Settings(BaseSettings):
     # Database settings
     # DATABASE_URL is loaded from .env if present. No default: must be set in .env
     DATABASE_URL: str
+    DB_ECHO: bool = False  # log every SQL statement
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
     
     # OpenAI settings
     # OPENAI_API_KEY is loaded from .env if present. No default: must be set in .env
     OPENAI_API_KEY: str
+    LLM_MODEL: str = "gpt-4.1-nano"
+    LLM_MAX_TOKENS: int = 1000
+    LLM_TEMPERATURE: float = 0.3
+    LLM_TIMEOUT_SECONDS: float = 60.0
+    LLM_MAX_CONCURRENCY: int = 8  # in-flight requests per process
+    LLM_TOKENS_PER_MINUTE: int = 200000  # 0 disables the token budget
+    LLM_MAX_RETRIES: int = 4  # on 429, 5xx, timeouts and connection errors
+    LLM_RETRY_BASE_SECONDS: float = 1.0
+    LLM_RETRY_MAX_SECONDS: float = 30.0
     
     # Server settings
     HOST: str = "0.0.0.0"
@@ -22,16 +35,116 @@ class Settings(BaseSettings):
     # Audio processing settings
     WHISPER_MODEL: str = "base"
     MAX_AUDIO_SIZE: int = 50 * 1024 * 1024  # 50MB
-    AUDIO_FORMATS: list = ["wav", "mp3", "m4a", "flac"]
+    AUDIO_FORMATS: list = ["wav", "mp3", "m4a", "flac", "webm", "ogg"]
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # 1MB
+    UPLOAD_HASH_ENABLED: bool = True  # reuse the transcription job of identical uploads
+    
+    # Speech-to-text settings
+    STT_BACKEND: str = "deepgram"  # "deepgram" or "local"
+    # DEEPGRAM_API_KEY is loaded from .env; required when STT_BACKEND is "deepgram"
+    DEEPGRAM_API_KEY: Optional[str] = None
+    DEEPGRAM_BASE_URL: str = "https://api.deepgram.com"
+    STT_MAX_CONCURRENCY: int = 8
+    STT_REQUESTS_PER_SECOND: float = 10.0  # 0 disables the rate limit
+    STT_BURST: int = 10
+    STT_TIMEOUT_SECONDS: float = 120.0
+    STT_DIARIZE: bool = True  # ask the provider for speaker labels
+    STT_LOCAL_TRANSCRIPT: str = "This is a local test transcript."
+    STT_LOCAL_LATENCY_SECONDS: float = 0.0
+    
+    # Incremental transcription settings
+    TRANSCRIBE_WINDOW_BYTES: int = 64 * 1024  # new audio needed before a window is transcribed
+    TRANSCRIBE_OVERLAP_SECONDS: float = 2.0
+    DECODER_BUFFER_SECONDS: float = 300.0  # decoded PCM kept per live meeting
+    # A meeting whose audio connections all closed is finalized once it ends, or after this long without a reconnect
+    TRANSCRIBE_RECONNECT_GRACE_SECONDS: float = 300.0
+    TRANSCRIBE_IDLE_POLL_SECONDS: float = 5.0
+    AUDIO_SINK_FLUSH_BYTES: int = 256 * 1024
+    AUDIO_SINK_FLUSH_SECONDS: float = 2.0
+    AUDIO_SINK_CHECKPOINT_SECONDS: float = 30.0  # fsync interval for live recordings
+    
+    # Voice activity detection (silence trimming before speech-to-text)
+    VAD_ENABLED: bool = True
+    VAD_FRAME_MS: int = 30
+    VAD_ENERGY_THRESHOLD_DB: float = -45.0  # dBFS; quieter frames count as silence
+    VAD_ZCR_THRESHOLD: float = 0.25  # zero-crossing rate that keeps quiet unvoiced speech
+    VAD_MIN_SILENCE_MS: int = 600  # shorter pauses are kept
+    VAD_PADDING_MS: int = 200
+    
+    # Transcode worker pool settings
+    TRANSCODE_WORKERS: int = 2
+    TRANSCODE_QUEUE_SIZE: int = 32
+    
+    # Insight generation settings
+    INSIGHTS_CHUNK_TOKENS: int = 6000  # longer transcripts are summarized in parallel chunks
+    INSIGHTS_MAX_PARALLEL: int = 4
+    LIVE_SUMMARY_ENABLED: bool = True  # keep a rolling summary while meetings are active
+    LIVE_SUMMARY_INTERVAL_SECONDS: float = 60.0
+    LIVE_SUMMARY_MIN_NEW_CHARS: int = 200  # skip updates until this much new text arrived
+    INSIGHT_LEASE_SECONDS: float = 120.0  # a worker that stops renewing loses the lease after this
+    INSIGHT_LEASE_POLL_SECONDS: float = 2.0  # how often waiters check on another worker's generation
+    SUMMARY_STREAM_PUBLISH_SECONDS: float = 0.25  # how often streamed insight text is pushed to clients
+    SUMMARY_FEED_POLL_SECONDS: float = 0.25  # how often web processes check for summary updates
+    
+    # Pipeline job queue settings
+    JOB_RUN_IN_WEB: bool = False  # also run the pipeline worker inside the web process (development)
+    JOB_TRANSCRIBE_CONCURRENCY: int = 2
+    JOB_INSIGHTS_CONCURRENCY: int = 4
+    JOB_BACKFILL_CONCURRENCY: int = 1
+    JOB_JANITOR_CONCURRENCY: int = 1
+    JOB_VISIBILITY_TIMEOUT_SECONDS: float = 300.0  # running jobs not renewed within this are retried
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF_SECONDS: float = 30.0  # doubled after each failed attempt
+    JOB_POLL_SECONDS: float = 1.0
+    
+    # Insight backfill settings
+    ADMIN_API_KEY: Optional[str] = None  # required in X-Admin-Key for /api/admin; admin endpoints are off when unset
+    BACKFILL_MAX_CONCURRENCY: int = 8  # upper bound for a run's parallel LLM calls
+    BACKFILL_BATCH_SIZE: int = 50
+    
+    # Insight cache settings
+    INSIGHT_CACHE_MEMORY_SIZE: int = 256
+    INSIGHT_CACHE_DB_MAX_ENTRIES: int = 10000
+    INSIGHT_CACHE_TTL_DAYS: int = 30
+    
+    # Read-through cache for polled meeting status and insight views
+    READ_CACHE_BACKEND: str = "memory"  # "memory" (per process) or "redis" (shared, needs the redis package)
+    READ_CACHE_REDIS_URL: Optional[str] = None
+    READ_CACHE_TTL_SECONDS: float = 5.0  # bounds staleness where an invalidation was not seen
+    READ_CACHE_LOCAL_TTL_SECONDS: float = 1.0  # in-process tier TTL when a shared tier is configured
+    READ_CACHE_MEMORY_SIZE: int = 2048
+    
+    # Transcript retrieval settings
+    TRANSCRIPT_PAGE_SIZE: int = 200
+    TRANSCRIPT_MAX_PAGE_SIZE: int = 1000
+    TRANSCRIPT_STREAM_BATCH: int = 500  # rows fetched per round trip from the server-side cursor
     
     # Meeting settings
     MAX_PARTICIPANTS: int = 4
-    ROOM_CODE_LENGTH: int = 6
+    ROOM_CODE_LENGTH: int = 6  # codes permute a shared counter over 36**length values; do not change once meetings exist
+    ROOM_CODE_BLOCK_SIZE: int = 100  # counter values each process reserves per database round trip
     
     # File storage settings
     RECORDINGS_DIR: str = "recordings"
     TEMP_DIR: str = "temp"
     
+    # Recording retention settings (sweeps run in the pipeline worker)
+    RECORDING_JANITOR_ENABLED: bool = True
+    RECORDING_JANITOR_INTERVAL_SECONDS: float = 3600.0
+    RECORDING_GRACE_SECONDS: float = 3600.0  # files modified more recently are never touched
+    RECORDING_RETENTION_DAYS: int = 30  # recordings of meetings that ended earlier are deleted, not archived
+    RECORDING_DISK_QUOTA_BYTES: int = 20 * 1024 ** 3  # oldest archives are deleted above this
+    RECORDING_ARCHIVE_ENABLED: bool = True
+    RECORDING_ARCHIVE_DIR: str = "recordings/archive"
+    RECORDING_ARCHIVE_BITRATE: str = "24k"  # Opus, mono, voice tuned
+    RECORDING_ARCHIVE_BATCH: int = 8  # recordings re-encoded per ffmpeg run
+    
+    @model_validator(mode="after")
+    def check_stt_credentials(self):
+        if self.STT_BACKEND == "deepgram" and not self.DEEPGRAM_API_KEY:
+            raise ValueError("DEEPGRAM_API_KEY must be set in .env when STT_BACKEND is \"deepgram\"")
+        return self
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
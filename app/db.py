@@ -1,6 +1,37 @@
+from typing import AsyncIterator
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlmodel import create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.config import settings
 
-print("DATABASE_URL in use:", settings.DATABASE_URL)  # Add this line
+def async_database_url(url: str) -> str:
+    """Same database, through an async driver (asyncpg for Postgres, aiosqlite for SQLite)."""
+    for prefix, async_prefix in (
+        ("postgresql+psycopg2://", "postgresql+asyncpg://"),
+        ("postgresql://", "postgresql+asyncpg://"),
+        ("postgres://", "postgresql+asyncpg://"),
+        ("sqlite://", "sqlite+aiosqlite://"),
+    ):
+        if url.startswith(prefix):
+            return async_prefix + url[len(prefix):]
+    return url
 
-engine = create_engine(settings.DATABASE_URL, echo=True)
\ No newline at end of file
+# Sync engine for schema migrations only; everything else goes through the async engine
+engine = create_engine(settings.DATABASE_URL, echo=settings.DB_ECHO, pool_pre_ping=True)
+
+# Async engine for request handlers and services on the event loop
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    echo=settings.DB_ECHO,
+    pool_pre_ping=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW
+)
+
+# Objects stay usable after commit, as handlers return them after the session closes
+async_session = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+async def get_session() -> AsyncIterator[AsyncSession]:
+    """Per-request session dependency"""
+    async with async_session() as session:
+        yield session
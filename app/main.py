@@ -1,12 +1,19 @@
+import asyncio
+import logging
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from sqlmodel import SQLModel
 from app.config import settings
-from app.routers import meetings, transcriptions, insights
+from app.routers import meetings, transcriptions, insights, admin
 from app.services.websocket_manager import router as ws_router
-from app.db import engine
+from app.db import async_engine, engine
+from app.migrations import require_current
 from app.routers.jaas import router as jaas_router
+from app.services.stt_backends import close_stt_backend
+from app.utils.llm_client import close_llm_client
+from app.services.read_cache import read_cache
+from app.services.transcode_executor import transcode_executor
 
+logger = logging.getLogger(__name__)
 app = FastAPI()
 
 # Add CORS middleware
@@ -25,11 +32,29 @@ app.add_middleware(
 )
 
 @app.on_event("startup")
-def on_startup():
-    SQLModel.metadata.create_all(engine)
+async def on_startup():
+    # The schema is managed by `python -m app.migrations upgrade`, run before the app starts
+    require_current(engine)
+    if settings.JOB_RUN_IN_WEB:
+        # Single-process development setup; production runs `python -m app.worker`
+        from app.worker import build_worker
+        app.state.worker = build_worker()
+        app.state.worker_task = asyncio.create_task(app.state.worker.run())
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    if settings.JOB_RUN_IN_WEB:
+        app.state.worker.stop()
+        await app.state.worker_task
+    await transcode_executor.shutdown()
+    await close_stt_backend()
+    await close_llm_client()
+    await read_cache.close()
+    await async_engine.dispose()
 
 app.include_router(meetings.router, prefix="/api/meetings")
 app.include_router(transcriptions.router, prefix="/api/transcriptions")
 app.include_router(insights.router, prefix="/api/insights")
+app.include_router(admin.router, prefix="/api/admin")
 app.include_router(ws_router)
 app.include_router(jaas_router, prefix='/api/jaas-jwt')
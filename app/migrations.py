@@ -0,0 +1,234 @@
+"""Versioned schema migrations.
+
+Run before starting the web app or the worker:
+
+    python -m app.migrations upgrade    # apply pending migrations
+    python -m app.migrations status     # list applied and pending migrations
+
+Applied versions are recorded in the schema_migrations table. Each migration
+runs in its own transaction; on PostgreSQL an advisory lock keeps concurrent
+deploys from migrating at the same time.
+
+Migration 1 creates the tables from the current models, so on a fresh database
+it already includes what later migrations add. Later migrations must therefore
+be idempotent (check for the column or index before adding it).
+"""
+import argparse
+import importlib
+import logging
+import secrets
+import uuid
+from datetime import datetime
+from typing import Callable, List, NamedTuple, Optional
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import SQLModel
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary key shared by every process that runs migrations
+ADVISORY_LOCK_KEY = 7305221
+
+schema_migrations = Table(
+    "schema_migrations", MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+MODEL_MODULES = (
+    "insight", "insight_backfill", "insight_cache", "insight_lease", "meeting",
+    "participant", "pipeline_job", "room_code", "summary_update", "transcript_segment", "transcription"
+)
+
+def load_models():
+    """Import every table model so SQLModel.metadata is complete."""
+    for module in MODEL_MODULES:
+        importlib.import_module(f"app.models.{module}")
+
+def _table(name: str) -> Table:
+    load_models()
+    return SQLModel.metadata.tables[name]
+
+def _index(table: str, name: str):
+    return next(i for i in _table(table).indexes if i.name == name)
+
+def _has_column(conn: Connection, table: str, column: str) -> bool:
+    return any(c["name"] == column for c in inspect(conn).get_columns(table))
+
+def _add_column(conn: Connection, table: str, column: str):
+    """Add a model column to an existing table unless it is already there."""
+    if not _has_column(conn, table, column):
+        column_type = _table(table).c[column].type.compile(dialect=conn.dialect)
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}"))
+
+# --- Migrations ---
+
+def _create_tables(conn: Connection):
+    load_models()
+    SQLModel.metadata.create_all(conn, checkfirst=True)
+
+def _add_untracked_columns(conn: Connection):
+    # Columns added to the models while the schema was still built by create_all at startup
+    if not _has_column(conn, "insight", "version"):
+        conn.execute(text("ALTER TABLE insight ADD COLUMN version VARCHAR"))
+        _index("insight", "ix_insight_version").create(conn, checkfirst=True)
+
+def _add_lookup_indexes(conn: Connection):
+    # Keep the newest insight of meetings that were summarized more than once
+    result = conn.execute(text(
+        "DELETE FROM insight WHERE EXISTS ("
+        " SELECT 1 FROM insight newer WHERE newer.meeting_id = insight.meeting_id"
+        " AND (newer.created_at > insight.created_at"
+        " OR (newer.created_at = insight.created_at AND newer.id > insight.id)))"
+    ))
+    if result.rowcount:
+        logger.warning(f"[MIGRATE] Removed {result.rowcount} duplicate insights")
+    _index("insight", "uq_insight_meeting_id").create(conn, checkfirst=True)
+    _index("transcription", "ix_transcription_meeting_timestamp").create(conn, checkfirst=True)
+    _index("meeting", "ix_meeting_status_created_at").create(conn, checkfirst=True)
+
+def _add_participants(conn: Connection):
+    if not _has_column(conn, "meeting", "participant_count"):
+        conn.execute(text("ALTER TABLE meeting ADD COLUMN participant_count INTEGER NOT NULL DEFAULT 0"))
+    _table("meetingparticipant").create(conn, checkfirst=True)
+    # Move the participants JSON lists into rows
+    meeting = _table("meeting")
+    meetings = conn.execute(
+        select(meeting.c.id, meeting.c.participants, meeting.c.created_at).where(meeting.c.participant_count == 0)
+    ).all()
+    participant_rows, counts = [], []
+    for meeting_id, participants, created_at in meetings:
+        names = list(dict.fromkeys(participants or []))
+        if not names:
+            continue
+        participant_rows += [{"id": str(uuid.uuid4()), "meeting_id": meeting_id, "user_name": name,
+                              "joined_at": created_at} for name in names]
+        counts.append({"meeting_id": meeting_id, "count": len(names)})
+    if participant_rows:
+        conn.execute(_table("meetingparticipant").insert(), participant_rows)
+        conn.execute(text("UPDATE meeting SET participant_count = :count WHERE id = :meeting_id"), counts)
+        logger.info(f"[MIGRATE] Moved {len(participant_rows)} participants of {len(counts)} meetings into rows")
+
+def _add_room_code_counter(conn: Connection):
+    counter = _table("roomcodecounter")
+    reserved = _table("reservedroomcode")
+    counter.create(conn, checkfirst=True)
+    reserved.create(conn, checkfirst=True)
+    if conn.execute(select(counter.c.name).where(counter.c.name == "meeting")).first() is None:
+        conn.execute(counter.insert().values(name="meeting", next_value=0, key=secrets.token_hex(32)))
+    # Randomly generated codes already in use must never be allocated again
+    meeting = _table("meeting")
+    codes = {code for row in conn.execute(select(meeting.c.id, meeting.c.jitsi_room)) for code in row if code}
+    codes -= set(conn.execute(select(reserved.c.code)).scalars())
+    if codes:
+        conn.execute(reserved.insert(), [{"code": code} for code in codes])
+        logger.info(f"[MIGRATE] Reserved {len(codes)} existing room codes")
+
+def _unique_active_dedupe_key(conn: Connection):
+    # Concurrent enqueues could insert the same key twice; keep the running (or else oldest) job of each key
+    job = _table("pipelinejob")
+    rows = conn.execute(
+        select(job.c.id, job.c.dedupe_key, job.c.status, job.c.created_at)
+        .where(job.c.dedupe_key.is_not(None), job.c.status.in_(("queued", "running")))
+    ).all()
+    rows.sort(key=lambda row: (row.dedupe_key, row.status != "running", row.created_at))
+    kept, duplicates = set(), []
+    for row in rows:
+        if row.dedupe_key in kept:
+            duplicates.append(row.id)
+        kept.add(row.dedupe_key)
+    if duplicates:
+        conn.execute(
+            job.update().where(job.c.id.in_(duplicates))
+            .values(status="failed", error="Duplicate of another job with the same dedupe key",
+                    locked_until=None, finished_at=datetime.utcnow())
+        )
+        logger.warning(f"[MIGRATE] Failed {len(duplicates)} duplicate queued or running jobs")
+    _index("pipelinejob", "uq_pipelinejob_active_dedupe_key").create(conn, checkfirst=True)
+
+def _add_live_summary_state(conn: Connection):
+    for column in ("live_analysis", "live_folded_at", "live_folded_segment_id"):
+        _add_column(conn, "summaryupdate", column)
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Create tables", _create_tables),
+    Migration(2, "Add columns created before versioned migrations", _add_untracked_columns),
+    Migration(3, "Unique insight per meeting and indexes on lookup columns", _add_lookup_indexes),
+    Migration(4, "Meeting participants as rows with a seat counter", _add_participants),
+    Migration(5, "Room code counter and reserved legacy codes", _add_room_code_counter),
+    Migration(6, "One queued or running job per dedupe key", _unique_active_dedupe_key),
+    Migration(7, "Live summary state on the summary update row", _add_live_summary_state),
+]
+
+# --- Runner ---
+
+def applied_versions(conn: Connection) -> List[int]:
+    if not inspect(conn).has_table("schema_migrations"):
+        return []
+    return [row[0] for row in conn.execute(schema_migrations.select().order_by(schema_migrations.c.version))]
+
+def pending_migrations(engine: Engine) -> List[Migration]:
+    with engine.connect() as conn:
+        applied = set(applied_versions(conn))
+    return [m for m in MIGRATIONS if m.version not in applied]
+
+def require_current(engine: Engine):
+    """Raise if migrations are pending, so no process runs against an older schema."""
+    pending = pending_migrations(engine)
+    if pending:
+        raise RuntimeError(
+            f"Database schema is behind, {len(pending)} migration(s) pending: run `python -m app.migrations upgrade`"
+        )
+
+def upgrade(engine: Engine, target: Optional[int] = None) -> List[Migration]:
+    """Apply pending migrations up to target (default: latest). Returns those applied."""
+    applied: List[Migration] = []
+    with engine.connect() as lock_conn:
+        if engine.dialect.name == "postgresql":
+            lock_conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+        try:
+            for migration in pending_migrations(engine):
+                if target is not None and migration.version > target:
+                    break
+                logger.info(f"[MIGRATE] Applying {migration.version}: {migration.description}")
+                with engine.begin() as conn:
+                    schema_migrations.create(conn, checkfirst=True)
+                    migration.upgrade(conn)
+                    conn.execute(schema_migrations.insert().values(
+                        version=migration.version,
+                        description=migration.description,
+                        applied_at=datetime.utcnow()
+                    ))
+                applied.append(migration)
+        finally:
+            if engine.dialect.name == "postgresql":
+                lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY})
+                lock_conn.commit()
+    return applied
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog="python -m app.migrations", description="Manage the database schema")
+    commands = parser.add_subparsers(dest="command", required=True)
+    up = commands.add_parser("upgrade", help="apply pending migrations")
+    up.add_argument("--target", type=int, help="stop after this version")
+    commands.add_parser("status", help="list applied and pending migrations")
+    args = parser.parse_args(argv)
+
+    from app.db import engine
+    if args.command == "upgrade":
+        applied = upgrade(engine, args.target)
+        print(f"Applied {len(applied)} migration(s)" if applied else "Schema is up to date")
+    else:
+        pending = {m.version for m in pending_migrations(engine)}
+        for m in MIGRATIONS:
+            print(f"{m.version:04d} {'pending' if m.version in pending else 'applied'}  {m.description}")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
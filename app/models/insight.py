@@ -1,11 +1,18 @@
 from sqlmodel import SQLModel, Field
-from sqlalchemy import Column, Text
+from sqlalchemy import Column, Index, Text
+from typing import Optional
 from datetime import datetime
 
 class Insight(SQLModel, table=True):
+    __table_args__ = (
+        # One insight per meeting; also serves every lookup by meeting
+        Index("uq_insight_meeting_id", "meeting_id", unique=True),
+    )
     id: str = Field(primary_key=True, default=None)
     meeting_id: str = Field(foreign_key="meeting.id")
     summary: str = Field(sa_column=Column(Text))
     action_items: str = Field(sa_column=Column(Text))
     decisions: str = Field(sa_column=Column(Text))
+    # insights_fingerprint() of the prompt and model that produced it; None for older rows
+    version: Optional[str] = Field(default=None, index=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
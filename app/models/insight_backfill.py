@@ -0,0 +1,24 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, JSON, Text
+from typing import Optional
+from datetime import datetime
+
+class InsightBackfill(SQLModel, table=True):
+    id: str = Field(primary_key=True)
+    # created_from, created_to, status and select ("missing", "outdated" or "all")
+    filters: dict = Field(default_factory=dict, sa_column=Column(JSON))
+    concurrency: int = 4
+    batch_size: int = 50
+    status: str = "queued"  # queued, running, completed, cancelled, failed
+    # Keyset position of the last processed meeting, ordered by (created_at, id)
+    cursor_created_at: Optional[datetime] = None
+    cursor_meeting_id: Optional[str] = None
+    processed: int = 0
+    succeeded: int = 0
+    skipped: int = 0  # meetings without a transcript
+    failed: int = 0
+    error: Optional[str] = Field(default=None, sa_column=Column(Text))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
@@ -0,0 +1,14 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, Text
+from datetime import datetime
+
+class InsightCacheEntry(SQLModel, table=True):
+    # sha256 of the normalized transcript plus prompt and model version
+    key: str = Field(primary_key=True)
+    fingerprint: str
+    summary: str = Field(sa_column=Column(Text))
+    action_items: str = Field(sa_column=Column(Text))
+    decisions: str = Field(sa_column=Column(Text))
+    hits: int = 0
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    last_used_at: datetime = Field(default_factory=datetime.utcnow, index=True)
@@ -0,0 +1,12 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+class InsightLease(SQLModel, table=True):
+    # One row per meeting; whoever holds an unexpired lease is generating its insight
+    meeting_id: str = Field(primary_key=True, foreign_key="meeting.id")
+    owner: str
+    status: str = "running"  # running, completed, failed
+    error: Optional[str] = None
+    started_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime = Field(default_factory=datetime.utcnow)
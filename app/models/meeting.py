@@ -1,18 +1,21 @@
 from sqlmodel import SQLModel, Field, Column, JSON
+from sqlalchemy import Index
 from datetime import datetime
 from typing import Optional, List
-import random
-import string
-
-def generate_room_code(length=6):
-    return ''.join(random.choices(string.ascii_uppercase + string.digits, k=length))
 
 class Meeting(SQLModel, table=True):
-    id: str = Field(primary_key=True, default_factory=generate_room_code)
+    __table_args__ = (
+        # Listing meetings by status, newest first
+        Index("ix_meeting_status_created_at", "status", "created_at"),
+    )
+    id: str = Field(primary_key=True)  # room code from app.services.room_codes
     title: str
     owner_id: str
-    jitsi_room: str = Field(default_factory=generate_room_code)
+    jitsi_room: str  # room code from app.services.room_codes
+    # Superseded by MeetingParticipant rows; only meetings created before migration 0004 filled it
     participants: list = Field(default_factory=list, sa_column=Column(JSON))
+    # Participants currently in the meeting, kept in step with MeetingParticipant for atomic admission
+    participant_count: int = Field(default=0)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     ended_at: Optional[datetime] = None
     status: str = Field(default="active")
@@ -0,0 +1,15 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import UniqueConstraint
+from datetime import datetime
+from typing import Optional
+
+class MeetingParticipant(SQLModel, table=True):
+    __table_args__ = (
+        # A user holds one row per meeting; leaving sets left_at and rejoining clears it
+        UniqueConstraint("meeting_id", "user_name", name="uq_meetingparticipant_meeting_user"),
+    )
+    id: str = Field(primary_key=True)
+    meeting_id: str = Field(foreign_key="meeting.id")
+    user_name: str
+    joined_at: datetime = Field(default_factory=datetime.utcnow)
+    left_at: Optional[datetime] = None
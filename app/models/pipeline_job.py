@@ -0,0 +1,35 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, Index, JSON, Text, text
+from typing import Optional
+from datetime import datetime
+
+class PipelineJob(SQLModel, table=True):
+    __table_args__ = (
+        # Workers claim the highest priority visible job of one stage
+        Index("ix_pipelinejob_claim", "kind", "status", "priority", "available_at"),
+        # At most one queued or running job per dedupe key, however many processes enqueue it
+        Index(
+            "uq_pipelinejob_active_dedupe_key", "dedupe_key", unique=True,
+            postgresql_where=text("status IN ('queued', 'running')"),
+            sqlite_where=text("status IN ('queued', 'running')")
+        ),
+    )
+    id: str = Field(primary_key=True)
+    kind: str  # pipeline stage, e.g. "transcribe" or "insights"
+    meeting_id: Optional[str] = Field(default=None, index=True)  # None for jobs spanning meetings
+    payload: dict = Field(default_factory=dict, sa_column=Column(JSON))
+    priority: int = 0  # higher runs first
+    status: str = "queued"  # queued, running, completed, failed
+    dedupe_key: Optional[str] = Field(default=None, index=True)
+    attempts: int = 0
+    max_attempts: int = 3
+    result: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    error: Optional[str] = Field(default=None, sa_column=Column(Text))
+    # Not claimable before this time; used for retry backoff
+    available_at: datetime = Field(default_factory=datetime.utcnow)
+    locked_by: Optional[str] = None
+    # A running job whose worker stops renewing this becomes claimable again
+    locked_until: Optional[datetime] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
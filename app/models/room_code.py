@@ -0,0 +1,10 @@
+from sqlmodel import SQLModel, Field
+
+class RoomCodeCounter(SQLModel, table=True):
+    name: str = Field(primary_key=True)  # "meeting"
+    next_value: int = 0  # first counter value not yet handed out
+    key: str  # hex secret keying the code permutation, shared by every process
+
+class ReservedRoomCode(SQLModel, table=True):
+    # Codes handed out randomly before the allocator existed; never allocated again
+    code: str = Field(primary_key=True)
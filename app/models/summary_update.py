@@ -0,0 +1,15 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, JSON, Text
+from datetime import datetime
+from typing import Optional
+
+class SummaryUpdate(SQLModel, table=True):
+    # Latest /ws/summary message for a meeting; seq grows with every update
+    meeting_id: str = Field(primary_key=True, foreign_key="meeting.id")
+    seq: int = 0
+    payload: dict = Field(default_factory=dict, sa_column=Column(JSON))
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    # Running analysis of a live meeting and the (created_at, id) of the last segment folded into it
+    live_analysis: Optional[str] = Field(default=None, sa_column=Column(Text))
+    live_folded_at: Optional[datetime] = None
+    live_folded_segment_id: Optional[str] = None
@@ -0,0 +1,19 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, Index, Text
+from datetime import datetime
+from typing import Optional
+
+class TranscriptSegment(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_transcriptsegment_meeting_start", "meeting_id", "start"),
+    )
+
+    id: str = Field(primary_key=True, default=None)
+    meeting_id: str = Field(foreign_key="meeting.id")
+    transcription_id: Optional[str] = Field(default=None, foreign_key="transcription.id")
+    start: float  # seconds from the start of the meeting recording
+    end: float
+    speaker: Optional[str] = None
+    confidence: Optional[float] = None
+    text: str = Field(sa_column=Column(Text))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -1,8 +1,12 @@
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
 from datetime import datetime
 from typing import Optional
 
 class Transcription(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_transcription_meeting_timestamp", "meeting_id", "timestamp"),
+    )
     id: str = Field(primary_key=True, default=None)
     meeting_id: str = Field(foreign_key="meeting.id")
     content: str
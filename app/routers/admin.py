@@ -0,0 +1,81 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Literal, Optional
+from app.config import settings
+from app.services.insight_backfill import insight_backfiller
+from app.services.job_queue import job_queue, job_to_dict, PRIORITY_DEFAULT
+import secrets
+import logging
+
+logger = logging.getLogger(__name__)
+
+def require_admin(x_admin_key: Optional[str] = Header(None)):
+    """Admin endpoints are disabled unless ADMIN_API_KEY is set, and then require it."""
+    if not settings.ADMIN_API_KEY:
+        raise HTTPException(403, "Admin API is disabled")
+    if not x_admin_key or not secrets.compare_digest(x_admin_key, settings.ADMIN_API_KEY):
+        raise HTTPException(401, "Invalid admin key")
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+class BackfillRequest(BaseModel):
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    status: Optional[str] = None  # meeting status, e.g. "ended"
+    # missing: meetings without an insight; outdated: also insights from another prompt or model
+    select: Literal["missing", "outdated", "all"] = "outdated"
+    concurrency: int = 4
+    batch_size: int = settings.BACKFILL_BATCH_SIZE
+
+@router.post("/insights/backfill", status_code=202)
+async def start_insight_backfill(request: BackfillRequest):
+    """Regenerate insights for the meetings matching the filters, in a background job"""
+    filters = {
+        "created_from": request.created_from.isoformat() if request.created_from else None,
+        "created_to": request.created_to.isoformat() if request.created_to else None,
+        "status": request.status,
+        "select": request.select,
+    }
+    run = await insight_backfiller.create(filters, request.concurrency, request.batch_size)
+    logger.info(f"[BACKFILL] Created run {run.id} with filters {filters}")
+    return await insight_backfiller.progress(run)
+
+@router.get("/insights/backfill")
+async def list_insight_backfills():
+    """Recent backfill runs, newest first"""
+    return await insight_backfiller.list_runs()
+
+@router.get("/insights/backfill/{run_id}")
+async def get_insight_backfill(run_id: str):
+    """Progress and throughput of a backfill run"""
+    run = await insight_backfiller.get(run_id)
+    if not run:
+        raise HTTPException(404, "Backfill run not found")
+    return await insight_backfiller.progress(run)
+
+@router.post("/insights/backfill/{run_id}/cancel")
+async def cancel_insight_backfill(run_id: str):
+    """Stop a backfill run after its current batch"""
+    run = await insight_backfiller.cancel(run_id)
+    if not run:
+        raise HTTPException(404, "Backfill run not found")
+    return await insight_backfiller.progress(run)
+
+@router.post("/insights/backfill/{run_id}/resume")
+async def resume_insight_backfill(run_id: str):
+    """Continue a cancelled or failed backfill run from its cursor"""
+    run = await insight_backfiller.resume(run_id)
+    if not run:
+        raise HTTPException(404, "Backfill run not found")
+    return await insight_backfiller.progress(run)
+
+@router.post("/recordings/sweep", status_code=202)
+async def sweep_recordings(dry_run: bool = Query(False, description="report what would be reclaimed without deleting")):
+    """Queue a recording retention sweep; the job result reports the reclaimed bytes"""
+    if dry_run:
+        job = await job_queue.enqueue("janitor", None, {"dry_run": True}, PRIORITY_DEFAULT)
+    else:
+        job = await job_queue.enqueue("janitor", None, {"dry_run": False}, PRIORITY_DEFAULT,
+                                      dedupe_key="janitor:recordings", reuse=("queued", "running"))
+    return job_to_dict(job)
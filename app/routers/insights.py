@@ -1,22 +1,23 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from sqlmodel import Session, select
-from app.db import engine
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.db import get_session
 from app.models.insight import Insight
-from app.models.transcription import Transcription
-from app.services.insight_generator import generate_insights_for_meeting
+from app.services.insight_generator import enqueue_insights
+from app.services.job_queue import job_to_dict
+from app.services.read_cache import get_summary_view, invalidate_summary
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.get("/{meeting_id}")
-async def get_meeting_insights(meeting_id: str):
+async def get_meeting_insights(meeting_id: str, s: AsyncSession = Depends(get_session)):
     """Get insights for a specific meeting"""
     try:
-        with Session(engine) as s:
-            insight = s.exec(
-                select(Insight).where(Insight.meeting_id == meeting_id)
-            ).first()
+        insight = (await s.exec(
+            select(Insight).where(Insight.meeting_id == meeting_id)
+        )).first()
             
         if not insight:
             raise HTTPException(404, "Insights not found for this meeting")
@@ -30,42 +31,42 @@ async def get_meeting_insights(meeting_id: str):
         raise HTTPException(500, "Internal server error")
 
 @router.post("/{meeting_id}/generate")
-async def generate_meeting_insights(meeting_id: str, background_tasks: BackgroundTasks):
-    """Generate insights for a meeting (triggers background processing)"""
+async def generate_meeting_insights(meeting_id: str, s: AsyncSession = Depends(get_session)):
+    """Generate insights for a meeting (queues a pipeline job).
+
+    Returns the job already queued or running for the meeting, if any.
+    """
     try:
         # Check if insights already exist
-        with Session(engine) as s:
-            existing = s.exec(
-                select(Insight).where(Insight.meeting_id == meeting_id)
-            ).first()
+        existing = (await s.exec(
+            select(Insight).where(Insight.meeting_id == meeting_id)
+        )).first()
             
         if existing:
-            return {"message": "Insights already exist", "insight": existing}
+            return {"message": "Insights already exist", "insight": existing, "status": "completed"}
             
-        # Add to background tasks
-        background_tasks.add_task(generate_insights_for_meeting, meeting_id)
+        job = await enqueue_insights(meeting_id)
         
-        return {"message": "Insight generation started", "meeting_id": meeting_id}
+        return {"message": "Insight generation started", "meeting_id": meeting_id, **job_to_dict(job)}
         
     except Exception as e:
         logger.error(f"Failed to start insight generation for meeting {meeting_id}: {e}")
         raise HTTPException(500, "Failed to start insight generation")
 
 @router.delete("/{meeting_id}")
-async def delete_meeting_insights(meeting_id: str):
+async def delete_meeting_insights(meeting_id: str, s: AsyncSession = Depends(get_session)):
     """Delete insights for a meeting"""
     try:
-        with Session(engine) as s:
-            insight = s.exec(
-                select(Insight).where(Insight.meeting_id == meeting_id)
-            ).first()
+        insight = (await s.exec(
+            select(Insight).where(Insight.meeting_id == meeting_id)
+        )).first()
             
         if not insight:
             raise HTTPException(404, "Insights not found")
             
-        with Session(engine) as s:
-            s.delete(insight)
-            s.commit()
+        await s.delete(insight)
+        await s.commit()
+        await invalidate_summary(meeting_id)
             
         return {"message": "Insights deleted successfully"}
         
@@ -76,32 +77,32 @@ async def delete_meeting_insights(meeting_id: str):
         raise HTTPException(500, "Internal server error")
 
 @router.get("/{meeting_id}/view")
-async def view_or_generate_meeting_insights(meeting_id: str, background_tasks: BackgroundTasks):
+async def view_or_generate_meeting_insights(meeting_id: str):
     """View or trigger generation of insights for a meeting."""
     print(f"[INSIGHTS] /view endpoint called for meeting_id={meeting_id}")
     try:
-        with Session(engine) as s:
-            insight = s.exec(
-                select(Insight).where(Insight.meeting_id == meeting_id)
-            ).first()
+        view = await get_summary_view(meeting_id)
+        insight = view["insight"]
         if insight:
             # Always return a flat JSON object with non-null strings
             return {
-                "summary": getattr(insight, "summary", "") or "",
-                "action_items": getattr(insight, "action_items", "") or "",
-                "decisions": getattr(insight, "decisions", "") or "",
-                "summary_available": True
+                "summary": insight.get("summary") or "",
+                "action_items": insight.get("action_items") or "",
+                "decisions": insight.get("decisions") or "",
+                "summary_available": True,
+                "status": "completed"
             }
         # Check if there are any transcriptions
-        with Session(engine) as s:
-            transcriptions = s.exec(
-                select(Transcription).where(Transcription.meeting_id == meeting_id)
-            ).all()
-        if not transcriptions or all((t.content or '').strip() == '' for t in transcriptions):
-            return {"message": "This meeting does not have any summary", "summary_available": False}
-        # If not found, trigger background generation
-        background_tasks.add_task(generate_insights_for_meeting, meeting_id)
-        return {"message": "Summary generation started. Please wait...", "summary_available": False}
+        if not view["has_transcript"]:
+            return {"message": "This meeting does not have any summary", "summary_available": False, "status": "not_started"}
+        # If not found, queue generation once; polls while it is pending only report its status.
+        # A failed generation is retried through POST /generate.
+        status = view["job_status"]
+        if status is None or status == "completed":
+            status = (await enqueue_insights(meeting_id)).status
+        if status == "failed":
+            return {"message": "Summary generation failed", "summary_available": False, "status": status}
+        return {"message": "Summary generation started. Please wait...", "summary_available": False, "status": status}
     except Exception as e:
         logger.error(f"Failed to view or generate insights for meeting {meeting_id}: {e}")
         raise HTTPException(500, "Failed to view or generate insights")
@@ -1,10 +1,21 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Request, Query
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+import asyncio
+import os
 import uuid
 from datetime import datetime
-from app.db import engine
-from app.models.meeting import Meeting, generate_room_code
-from app.services.insight_generator import generate_insights_for_meeting
+from app.config import settings
+from app.db import get_session
+from app.models.meeting import Meeting
+from app.models.participant import MeetingParticipant
+from app.services import participants
+from app.services.incremental_transcriber import incremental_transcriber
+from app.services.insight_generator import enqueue_insights
+from app.services.job_queue import PRIORITY_LIVE
+from app.services.read_cache import get_meeting_view, get_summary_view, invalidate_meeting
+from app.services.room_codes import room_code_allocator
+from app.utils.audio_metadata import probe_audio
 import logging
 from pydantic import BaseModel
 
@@ -18,32 +29,35 @@ class JoinRequest(BaseModel):
     user_name: str
 
 @router.post("/create")
-def create_meeting(title: str = Query(...), owner_name: str = Query(...)):
+async def create_meeting(title: str = Query(...), owner_name: str = Query(...),
+                         s: AsyncSession = Depends(get_session)):
     """Create a new meeting"""
     try:
+        meeting_id, jitsi_room = await room_code_allocator.allocate(2)
         meeting = Meeting(
+            id=meeting_id,
+            jitsi_room=jitsi_room,
             title=title,
             owner_id=owner_name,
-            participants=[owner_name]
+            participant_count=1
         )
-        with Session(engine) as s:
-            s.add(meeting)
-            s.commit()
-            s.refresh(meeting)
-        return meeting
+        s.add(meeting)
+        s.add(MeetingParticipant(id=str(uuid.uuid4()), meeting_id=meeting.id, user_name=owner_name))
+        await s.commit()
+        await invalidate_meeting(meeting.id)
+        return {**meeting.model_dump(), "participants": [owner_name]}
     except Exception as e:
         logger.error(f"Failed to create meeting: {e}")
         raise HTTPException(500, "Failed to create meeting")
 
 @router.get("/{meeting_id}")
-def get_meeting(meeting_id: str):
+async def get_meeting(meeting_id: str, s: AsyncSession = Depends(get_session)):
     """Get meeting details"""
     try:
-        with Session(engine) as s:
-            m = s.exec(select(Meeting).where(Meeting.id == meeting_id)).one_or_none()
+        m = (await s.exec(select(Meeting).where(Meeting.id == meeting_id))).one_or_none()
         if not m:
             raise HTTPException(404, "Meeting not found")
-        return m
+        return {**m.model_dump(), "participants": await participants.get_participants(meeting_id, s)}
     except HTTPException:
         raise
     except Exception as e:
@@ -51,48 +65,63 @@ def get_meeting(meeting_id: str):
         raise HTTPException(500, "Internal server error")
 
 @router.post("/{meeting_id}/join")
-def join_meeting(meeting_id: str, req: JoinRequest):
+async def join_meeting(meeting_id: str, req: JoinRequest, s: AsyncSession = Depends(get_session)):
     """Join an existing meeting"""
     user_name = req.user_name
     try:
-        with Session(engine) as s:
-            m = s.exec(select(Meeting).where(Meeting.id == meeting_id)).one_or_none()
-            if not m:
-                raise HTTPException(404, "Meeting not found")
-            if m.status != "active":
-                raise HTTPException(400, "Meeting has ended")
-            if len(m.participants) >= 4:
-                raise HTTPException(403, "Room is full (max 4 participants)")
-            if user_name not in m.participants:
-                m.participants.append(user_name)
-                s.add(m)
-                s.commit()
-                s.refresh(m)
-        return m
+        # Admission is a conditional update of the meeting's seat counter, so concurrent joins cannot exceed the cap
+        outcome = await participants.admit(meeting_id, user_name)
+        if outcome == participants.NOT_FOUND:
+            raise HTTPException(404, "Meeting not found")
+        if outcome == participants.ENDED:
+            raise HTTPException(400, "Meeting has ended")
+        if outcome == participants.FULL:
+            raise HTTPException(403, f"Room is full (max {settings.MAX_PARTICIPANTS} participants)")
+        if outcome == participants.JOINED:
+            await invalidate_meeting(meeting_id)
+        m = await s.get(Meeting, meeting_id)
+        return {**m.model_dump(), "participants": await participants.get_participants(meeting_id, s)}
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Failed to join meeting {meeting_id}: {e}")
         raise HTTPException(500, "Internal server error")
 
+@router.post("/{meeting_id}/leave")
+async def leave_meeting(meeting_id: str, req: JoinRequest):
+    """Leave a meeting, freeing the seat"""
+    try:
+        if not await participants.leave(meeting_id, req.user_name):
+            raise HTTPException(404, "Participant not in meeting")
+        await invalidate_meeting(meeting_id)
+        return {"message": "Left meeting", "meeting_id": meeting_id}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to leave meeting {meeting_id}: {e}")
+        raise HTTPException(500, "Internal server error")
+
 @router.post("/{meeting_id}/end")
-async def end_meeting(meeting_id: str, background_tasks: BackgroundTasks):
+async def end_meeting(meeting_id: str, s: AsyncSession = Depends(get_session)):
     """End a meeting and trigger summary generation"""
     try:
-        with Session(engine) as s:
-            m = s.exec(select(Meeting).where(Meeting.id == meeting_id)).one_or_none()
-            if not m:
-                raise HTTPException(404, "Meeting not found")
-            
-            # Update meeting status
-            m.status = "ended"
-            m.ended_at = datetime.utcnow()
-            s.add(m)
-            s.commit()
-            s.refresh(m)
+        m = (await s.exec(select(Meeting).where(Meeting.id == meeting_id))).one_or_none()
+        if not m:
+            raise HTTPException(404, "Meeting not found")
         
-        # Trigger insight generation in background
-        background_tasks.add_task(generate_insights_for_meeting, meeting_id)
+        # Update meeting status
+        m.status = "ended"
+        m.ended_at = datetime.utcnow()
+        s.add(m)
+        await s.commit()
+        await invalidate_meeting(meeting_id)
+        
+        # Transcribe the rest of the live recording held by this process, so insights see all of it;
+        # recordings held elsewhere are finalized when their process sees the meeting ended
+        await incremental_transcriber.finish(meeting_id)
+
+        # Queue insight generation ahead of backfills; it finishes the live summary if there is one
+        await enqueue_insights(meeting_id, PRIORITY_LIVE, live=settings.LIVE_SUMMARY_ENABLED)
         
         return {
             "message": "Meeting ended successfully",
@@ -107,26 +136,36 @@ async def end_meeting(meeting_id: str, background_tasks: BackgroundTasks):
         raise HTTPException(500, "Internal server error")
 
 @router.get("/{meeting_id}/status")
-def get_meeting_status(meeting_id: str):
-    """Get meeting status and summary availability"""
+async def get_meeting_status(meeting_id: str):
+    """Get meeting status and summary availability (served from the read cache while polled)"""
     try:
-        with Session(engine) as s:
-            m = s.exec(select(Meeting).where(Meeting.id == meeting_id)).one_or_none()
-            if not m:
-                raise HTTPException(404, "Meeting not found")
-            
-            # Check if insights exist
-            from app.models.insight import Insight
-            insight = s.exec(select(Insight).where(Insight.meeting_id == meeting_id)).first()
-            
-            return {
-                "meeting_id": meeting_id,
-                "status": m.status,
-                "participants": m.participants,
-                "created_at": m.created_at,
-                "ended_at": m.ended_at,
-                "summary_available": insight is not None
-            }
+        m = await get_meeting_view(meeting_id)
+        if not m:
+            raise HTTPException(404, "Meeting not found")
+        summary = await get_summary_view(meeting_id)
+        
+        # Length of the live recording, if any, read from its header. Files written from a
+        # stream that started mid-cluster have no header, so their length is unknown.
+        recording_path = os.path.join(settings.RECORDINGS_DIR, f"{meeting_id}_all.webm")
+        recording_seconds = None
+        recording_status = "none"
+        try:
+            recording_seconds = (await asyncio.to_thread(probe_audio, recording_path)).duration
+            recording_status = "unknown" if recording_seconds is None else "available"
+        except FileNotFoundError:
+            pass
+        
+        return {
+            "meeting_id": meeting_id,
+            "status": m["status"],
+            "participants": m["participants"],
+            "created_at": m["created_at"],
+            "ended_at": m["ended_at"],
+            "recording_seconds": recording_seconds,
+            "recording_status": recording_status,
+            "summary_available": summary["insight"] is not None,
+            "summary_status": summary["job_status"] or "not_started"
+        }
             
     except HTTPException:
         raise
@@ -1,72 +1,192 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, BackgroundTasks
-from sqlmodel import select, Session
-from app.db import engine
-from app.models.transcription import Transcription
-from app.services.transcription_service import transcribe_and_save, get_meeting_transcriptions
+from fastapi import APIRouter, HTTPException, Request, Query
+from fastapi.responses import StreamingResponse
+from app.config import settings
+from app.services.job_queue import job_queue, job_to_dict
+from app.services.transcription_service import (
+    get_transcript_segments, get_transcriptions_page, stream_meeting_transcriptions
+)
+from app.utils.audio_metadata import sniff_format
+from app.utils.upload_stream import iter_form_file
+import aiofiles
+import hashlib
 import logging
-import io
 import os
+import uuid
+from typing import AsyncIterator, Optional
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+@router.get("/transcode/stats")
+async def get_transcode_stats():
+    """Queue depth and wait times of the transcode worker pool"""
+    from app.services.transcode_executor import transcode_executor
+    return transcode_executor.stats()
+
+async def _encode_rows(first, rows: AsyncIterator, meeting_id: str, ndjson: bool):
+    """Encode transcriptions as they are read, as NDJSON lines or as one JSON array"""
+    try:
+        if not ndjson:
+            yield "["
+        row = first
+        while row is not None:
+            yield row.model_dump_json() + ("\n" if ndjson else "")
+            row = await anext(rows, None)
+            if row is not None and not ndjson:
+                yield ","
+        if not ndjson:
+            yield "]"
+    except Exception as e:
+        # Headers are already sent; the truncated body tells the client the stream failed
+        logger.error(f"Transcription stream for meeting {meeting_id} failed: {e}")
+    finally:
+        await rows.aclose()
+
 @router.get("/{meeting_id}")
-async def get_meeting_transcriptions_endpoint(meeting_id: str):
-    """Get all transcriptions for a meeting"""
+async def get_meeting_transcriptions_endpoint(
+    meeting_id: str,
+    format: str = Query("json", pattern="^(json|ndjson)$", description="json array or one JSON object per line")
+):
+    """Get all transcriptions for a meeting in time order.
+
+    Rows are streamed from a server-side cursor as they are read, so long
+    meetings start returning immediately and memory use does not grow with them.
+    """
+    rows = stream_meeting_transcriptions(meeting_id)
+    try:
+        # Read the first row up front so database errors still return a 500
+        first = await anext(rows, None)
+    except Exception as e:
+        await rows.aclose()
+        logger.error(f"Failed to get transcriptions for meeting {meeting_id}: {e}")
+        raise HTTPException(500, "Internal server error")
+    ndjson = format == "ndjson"
+    return StreamingResponse(
+        _encode_rows(first, rows, meeting_id, ndjson),
+        media_type="application/x-ndjson" if ndjson else "application/json"
+    )
+
+@router.get("/{meeting_id}/page")
+async def get_meeting_transcriptions_page(
+    meeting_id: str,
+    limit: int = Query(settings.TRANSCRIPT_PAGE_SIZE, ge=1, le=settings.TRANSCRIPT_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page")
+):
+    """Get a page of transcriptions for a meeting, keyed on (timestamp, id)"""
     try:
-        transcriptions = await get_meeting_transcriptions(meeting_id)
-        return transcriptions
+        items, next_cursor = await get_transcriptions_page(meeting_id, limit, cursor)
+        return {"items": items, "next_cursor": next_cursor}
+    except ValueError as e:
+        raise HTTPException(400, str(e))
     except Exception as e:
         logger.error(f"Failed to get transcriptions for meeting {meeting_id}: {e}")
         raise HTTPException(500, "Internal server error")
 
-@router.post("/{meeting_id}/upload")
+@router.get("/{meeting_id}/segments")
+async def get_transcript_segments_endpoint(
+    meeting_id: str,
+    start: Optional[float] = Query(None, description="Seconds from the start of the meeting"),
+    end: Optional[float] = Query(None)
+):
+    """Get timed transcript segments for a meeting, optionally for a time range"""
+    try:
+        return await get_transcript_segments(meeting_id, start, end)
+    except Exception as e:
+        logger.error(f"Failed to get transcript segments for meeting {meeting_id}: {e}")
+        raise HTTPException(500, "Internal server error")
+
+# The body is parsed as it arrives (see upload_stream), so the form is only described for the docs
+UPLOAD_FORM_SCHEMA = {
+    "requestBody": {
+        "required": True,
+        "content": {"multipart/form-data": {"schema": {
+            "type": "object",
+            "required": ["audio_file"],
+            "properties": {"audio_file": {"type": "string", "format": "binary"}}
+        }}}
+    }
+}
+
+@router.post("/{meeting_id}/upload", status_code=202, openapi_extra=UPLOAD_FORM_SCHEMA)
 async def upload_audio_and_transcribe(
     meeting_id: str, 
-    audio_file: UploadFile = File(...),
-    background_tasks: BackgroundTasks = None
+    request: Request
 ):
-    """Upload audio file and transcribe it"""
+    """Upload audio file (multipart field audio_file) and start transcribing it"""
+    part_path = os.path.join(settings.TEMP_DIR, f"{meeting_id}_{uuid.uuid4().hex}.part")
     try:
-        # Validate file type
-        if not audio_file.content_type.startswith('audio/'):
+        # Reject oversized uploads before reading them
+        content_length = request.headers.get("content-length")
+        if content_length and int(content_length) > settings.MAX_AUDIO_SIZE + 64 * 1024:
+            raise HTTPException(413, f"File exceeds maximum size of {settings.MAX_AUDIO_SIZE} bytes")
+        
+        # Stream the upload to disk, checking size and format as it arrives; an oversized body
+        # is cut off at the cap even when it is sent without a Content-Length
+        hasher = hashlib.sha256() if settings.UPLOAD_HASH_ENABLED else None
+        size = 0
+        audio_format = None
+        async with aiofiles.open(part_path, "wb") as f:
+            async for chunk in iter_form_file(request, "audio_file", settings.UPLOAD_CHUNK_SIZE):
+                if size == 0:
+                    audio_format = sniff_format(chunk)
+                    if audio_format not in settings.AUDIO_FORMATS:
+                        raise HTTPException(400, f"Unsupported audio format, expected one of {settings.AUDIO_FORMATS}")
+                size += len(chunk)
+                if size > settings.MAX_AUDIO_SIZE:
+                    raise HTTPException(413, f"File exceeds maximum size of {settings.MAX_AUDIO_SIZE} bytes")
+                if hasher:
+                    hasher.update(chunk)
+                await f.write(chunk)
+        if size == 0:
             raise HTTPException(400, "File must be an audio file")
         
-        # Save uploaded file as recordings/{meeting_id}_all.webm
-        recordings_dir = "recordings"
-        os.makedirs(recordings_dir, exist_ok=True)
-        file_path = os.path.join(recordings_dir, f"{meeting_id}_all.webm")
-        with open(file_path, "wb") as f:
-            f.write(await audio_file.read())
+        dedupe_key = f"{meeting_id}:{hasher.hexdigest()}" if hasher else None
+        existing = await job_queue.find(dedupe_key)
+        if existing:
+            return {"message": "Identical audio already uploaded", **job_to_dict(existing)}
         
-        # Process transcription
-        transcription = await transcribe_and_save(meeting_id)
+        # Each upload gets its own file, so queued jobs and the live recording never overwrite
+        # each other (ffmpeg detects the real format)
+        file_path = os.path.join(settings.RECORDINGS_DIR, f"{meeting_id}_upload_{uuid.uuid4().hex}.webm")
+        os.replace(part_path, file_path)
         
-        return {
-            "message": "Audio uploaded and transcribed successfully",
-            "transcription_id": transcription.id,
-            "content_length": len(transcription.content)
-        }
+        try:
+            job = await job_queue.enqueue("transcribe", meeting_id, {"audio_path": file_path}, dedupe_key=dedupe_key)
+        except Exception:
+            os.remove(file_path)
+            raise
+        logger.info(f"[UPLOAD] Stored {size} bytes of {audio_format} for meeting {meeting_id}, job {job.id}")
+        return {"message": "Audio uploaded, transcription started", "format": audio_format, "size": size, **job_to_dict(job)}
         
     except HTTPException:
         raise
+    except ValueError as e:
+        # Not a multipart form, malformed, or missing the audio_file field
+        raise HTTPException(400, str(e))
     except Exception as e:
         logger.error(f"Failed to process audio for meeting {meeting_id}: {e}")
         raise HTTPException(500, "Failed to process audio")
+    finally:
+        if os.path.exists(part_path):
+            os.remove(part_path)
 
-@router.post("/{meeting_id}/process")
-async def process_meeting_audio(
-    meeting_id: str,
-    background_tasks: BackgroundTasks
-):
-    """Process meeting audio and generate transcription"""
+@router.get("/jobs/{job_id}")
+async def get_transcription_job(job_id: str):
+    """Get the status of a pipeline job"""
+    job = await job_queue.get(job_id)
+    if not job:
+        raise HTTPException(404, "Job not found")
+    return job_to_dict(job)
+
+@router.post("/{meeting_id}/process", status_code=202)
+async def process_meeting_audio(meeting_id: str):
+    """Process meeting audio and generate transcription (queues a pipeline job)"""
     try:
-        # This would typically be called after a meeting ends
-        # For now, we'll return a placeholder response
+        job = await job_queue.enqueue("transcribe", meeting_id, dedupe_key=f"transcribe:{meeting_id}", reuse=("queued", "running"))
         return {
             "message": "Audio processing started",
             "meeting_id": meeting_id,
-            "status": "processing"
+            **job_to_dict(job)
         }
         
     except Exception as e:
@@ -4,24 +4,27 @@ import uuid
 # import whisper  # Remove whisper import
 import numpy as np
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict, Tuple
 import aiofiles
-from pydub import AudioSegment
 from pydub.utils import make_chunks
 import tempfile
 import logging
 import subprocess
-from deepgram import Deepgram
+from app.config import settings
+from app.utils.audio_metadata import probe_audio
+from app.utils.vad import TimeMap, trim_silence
+from app.services.audio_sink import AudioSink
+from app.services.stream_decoder import StreamDecoder
+from app.services.stt_backends import get_stt_backend
+from app.services.transcode_executor import transcode_executor
 
 logger = logging.getLogger(__name__)
 
-DEEPGRAM_API_KEY = "cbfbec93d0b50d7c430a3f5d71ca3fed751f8046"
-
-dg_client = Deepgram(DEEPGRAM_API_KEY)
-
 class AudioProcessor:
     def __init__(self):
         self.recordings_dir = "recordings"
+        self.streams: Dict[str, StreamDecoder] = {}
+        self.sinks: Dict[str, AudioSink] = {}
         self.ensure_directories()
         
     def ensure_directories(self):
@@ -32,65 +35,151 @@ class AudioProcessor:
     async def save_audio_chunk(self, meeting_id: str, audio_data: bytes) -> str:
         """Append an audio chunk to the meeting's .webm file."""
         webm_filepath = os.path.join(self.recordings_dir, f"{meeting_id}_all.webm")
-        async with aiofiles.open(webm_filepath, 'ab') as f:
-            await f.write(audio_data)
-        # Log file size after saving chunk
+        sink = self.sinks.get(meeting_id)
+        if sink:
+            await sink.write(audio_data)
+            size = sink.size
+        else:
+            async with aiofiles.open(webm_filepath, 'ab') as f:
+                await f.write(audio_data)
+                size = await f.tell()
+        stream = self.streams.get(meeting_id)
+        if stream:
+            await stream.feed(audio_data)
+        logger.debug(f"[AUDIO] Saved chunk for meeting {meeting_id}: {webm_filepath} (size: {size} bytes)")
+        return webm_filepath
+
+    async def open_sink(self, meeting_id: str) -> AudioSink:
+        """Keep the meeting's .webm file open and buffer writes while it is live."""
+        sink = self.sinks.get(meeting_id)
+        if sink:
+            return sink
+        sink = AudioSink(
+            os.path.join(self.recordings_dir, f"{meeting_id}_all.webm"),
+            settings.AUDIO_SINK_FLUSH_BYTES,
+            settings.AUDIO_SINK_FLUSH_SECONDS,
+            settings.AUDIO_SINK_CHECKPOINT_SECONDS
+        )
+        await sink.open()
+        self.sinks[meeting_id] = sink
+        return sink
+
+    async def checkpoint_sink(self, meeting_id: str):
+        """Make sure everything received so far is on disk before the file is read."""
+        sink = self.sinks.get(meeting_id)
+        if sink:
+            await sink.checkpoint()
+
+    async def close_sink(self, meeting_id: str):
+        sink = self.sinks.pop(meeting_id, None)
+        if sink:
+            await sink.close()
+
+    async def start_stream(self, meeting_id: str) -> Optional[StreamDecoder]:
+        """Start the live PCM decoder for a meeting, if it is not already running."""
+        stream = self.streams.get(meeting_id)
+        if stream:
+            return stream
+        stream = StreamDecoder(meeting_id, settings.DECODER_BUFFER_SECONDS)
         try:
-            size = os.path.getsize(webm_filepath)
-            logger.info(f"[AUDIO] Saved chunk for meeting {meeting_id}: {webm_filepath} (size: {size} bytes)")
+            await stream.start()
         except Exception as e:
-            logger.warning(f"[AUDIO] Could not get file size for {webm_filepath}: {e}")
-        return webm_filepath
+            logger.error(f"[AUDIO] Could not start stream decoder for meeting {meeting_id}: {e}")
+            return None
+        self.streams[meeting_id] = stream
+        return stream
 
-    async def transcode_meeting_audio(self, meeting_id: str) -> str:
-        """Transcode the concatenated .webm file to .wav after meeting ends."""
-        webm_filepath = os.path.join(self.recordings_dir, f"{meeting_id}_all.webm")
-        wav_filepath = os.path.join(self.recordings_dir, f"{meeting_id}_all.wav")
-        logger.info(f"[AUDIO] Starting transcoding for meeting {meeting_id}: {webm_filepath} -> {wav_filepath}")
-        cmd = [
-            'ffmpeg', '-y', '-i', webm_filepath,
+    async def stop_stream(self, meeting_id: str) -> Optional[StreamDecoder]:
+        """Flush and stop the live decoder. The returned decoder still holds its buffered PCM."""
+        stream = self.streams.pop(meeting_id, None)
+        if stream:
+            await stream.close()
+        return stream
+
+    async def transcode_meeting_audio(self, meeting_id: str, start: float = 0.0, source_path: Optional[str] = None) -> str:
+        """Transcode the concatenated .webm file (or an uploaded source_path) to .wav, optionally from a time offset in seconds."""
+        if source_path:
+            webm_filepath = source_path
+            wav_filepath = os.path.splitext(source_path)[0] + ".wav"
+        else:
+            webm_filepath = os.path.join(self.recordings_dir, f"{meeting_id}_all.webm")
+            await self.checkpoint_sink(meeting_id)
+            suffix = "window" if start > 0 else "all"
+            wav_filepath = os.path.join(self.recordings_dir, f"{meeting_id}_{suffix}.wav")
+        logger.info(f"[AUDIO] Starting transcoding for meeting {meeting_id} from {start:.2f}s: {webm_filepath} -> {wav_filepath}")
+        cmd = ['ffmpeg', '-y']
+        if start > 0:
+            cmd += ['-ss', f"{start:.3f}"]
+        cmd += [
+            '-i', webm_filepath,
             '-acodec', 'pcm_s16le', '-ar', '16000', '-ac', '1', wav_filepath
         ]
         try:
-            subprocess.run(cmd, check=True, capture_output=True)
+            await transcode_executor.submit(meeting_id, wav_filepath, cmd)
             logger.info(f"[AUDIO] Transcoding complete for meeting {meeting_id}: {wav_filepath}")
         except subprocess.CalledProcessError as e:
             logger.error(f"ffmpeg error (webm->wav): {e.stderr}")
             raise
         return wav_filepath
 
+    def remove_silence(self, wav_path: str) -> Tuple[Optional[str], Optional[TimeMap]]:
+        """Drop silent spans before upload. Returns (path to send, time map), or (None, None) if all silent."""
+        if not settings.VAD_ENABLED:
+            return wav_path, None
+        trimmed_path = os.path.splitext(wav_path)[0] + "_speech.wav"
+        try:
+            time_map = trim_silence(
+                wav_path, trimmed_path,
+                settings.VAD_FRAME_MS,
+                settings.VAD_ENERGY_THRESHOLD_DB,
+                settings.VAD_ZCR_THRESHOLD,
+                settings.VAD_MIN_SILENCE_MS,
+                settings.VAD_PADDING_MS
+            )
+        except Exception as e:
+            logger.warning(f"[AUDIO] Silence trimming failed for {wav_path}, sending full audio: {e}")
+            return wav_path, None
+        if time_map is None:
+            logger.info(f"[AUDIO] No speech detected in {wav_path}")
+            return None, None
+        logger.info(f"[AUDIO] Trimmed silence in {wav_path}: {os.path.getsize(wav_path)} -> {os.path.getsize(trimmed_path)} bytes")
+        return trimmed_path, time_map
+
     async def transcribe_audio(self, audio_path: str, language: Optional[str] = None) -> dict:
-        """Transcribe audio using Deepgram API"""
+        """Transcribe audio with the configured speech-to-text backend"""
         if not os.path.exists(audio_path):
             raise FileNotFoundError(f"Audio file not found: {audio_path}")
+        upload_path, time_map = await asyncio.to_thread(self.remove_silence, audio_path)
+        if upload_path is None:
+            return {"text": "", "segments": [], "words": [], "language": language or "en"}
         try:
-            with open(audio_path, "rb") as audio_file:
-                source = {"buffer": audio_file, "mimetype": "audio/wav"}
-                options = {"punctuate": True, "language": language or "en"}
-                response = await dg_client.transcription.prerecorded(source, options)
-                if not response or "results" not in response or not response["results"].get("channels"):
-                    logger.error(f"Deepgram returned no results for {audio_path}: {response}")
-                    return {"text": "", "segments": [], "language": language or "en"}
-                try:
-                    transcript = response["results"]["channels"][0]["alternatives"][0].get("transcript", "")
-                except Exception as e:
-                    logger.error(f"Error parsing Deepgram response: {e}, response: {response}")
-                    transcript = ""
-                return {
-                    "text": transcript,
-                    "segments": [],
-                    "language": language or "en"
-                }
+            result = await get_stt_backend().transcribe(upload_path, "audio/wav", language)
+            words = result["words"]
+            if time_map:
+                # Timestamps refer to the trimmed upload; map them back onto the recording
+                words = time_map.remap_words(words)
+            from app.services.transcription_service import build_segments
+            return {
+                "text": result["text"],
+                "segments": build_segments(words),
+                "words": words,
+                "language": language or "en"
+            }
         except Exception as e:
-            logger.error(f"Deepgram transcription failed: {e}")
-            logger.error(f"Full Deepgram response: {locals().get('response', None)}")
+            logger.error(f"Transcription failed for {audio_path}: {e}")
             raise
+        finally:
+            if upload_path != audio_path:
+                try:
+                    os.remove(upload_path)
+                except OSError:
+                    pass
 
-    async def process_meeting_audio(self, meeting_id: str) -> dict:
-        """Transcode and transcribe the full meeting audio after all chunks are received."""
+    async def process_meeting_audio(self, meeting_id: str, source_path: Optional[str] = None) -> dict:
+        """Transcode and transcribe the full meeting audio after all chunks are received, or an uploaded file."""
         try:
             # Transcode the full .webm file to .wav
-            wav_path = await self.transcode_meeting_audio(meeting_id)
+            wav_path = await self.transcode_meeting_audio(meeting_id, source_path=source_path)
             # Transcribe
             transcription_result = await self.transcribe_audio(wav_path)
             # Clean up files
@@ -99,7 +188,7 @@ class AudioProcessor:
             except OSError:
                 pass
             try:
-                os.remove(os.path.join(self.recordings_dir, f"{meeting_id}_all.webm"))
+                os.remove(source_path or os.path.join(self.recordings_dir, f"{meeting_id}_all.webm"))
             except OSError:
                 pass
             return transcription_result
@@ -108,10 +197,9 @@ class AudioProcessor:
             raise
 
     def get_audio_duration(self, audio_path: str) -> float:
-        """Get duration of audio file in seconds"""
+        """Get duration of audio file in seconds, read from its header"""
         try:
-            audio = AudioSegment.from_wav(audio_path)
-            return len(audio) / 1000.0  # Convert milliseconds to seconds
+            return probe_audio(audio_path).duration or 0.0
         except Exception as e:
             logger.error(f"Failed to get audio duration: {e}")
             return 0.0
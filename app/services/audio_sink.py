@@ -0,0 +1,75 @@
+import asyncio
+import os
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+class AudioSink:
+    """Write-behind file sink for one meeting's live audio.
+
+    Keeps a single handle open for the life of the connection and coalesces
+    small chunks in memory, writing them out once FLUSH_BYTES are buffered or
+    FLUSH_SECONDS have passed. The file is only fsynced at checkpoints and on
+    close. The size is tracked in memory so callers never need to stat the file.
+    """
+    def __init__(self, path: str, flush_bytes: int, flush_seconds: float, checkpoint_seconds: float):
+        self.path = path
+        self.flush_bytes = flush_bytes
+        self.flush_seconds = flush_seconds
+        self.checkpoint_seconds = checkpoint_seconds
+        self.size = 0
+        self._buffer = bytearray()
+        self._file = None
+        self._lock = asyncio.Lock()
+        self._last_flush = time.monotonic()
+        self._last_checkpoint = time.monotonic()
+
+    async def open(self):
+        self._file = await asyncio.to_thread(open, self.path, 'ab')
+        self.size = await asyncio.to_thread(os.path.getsize, self.path)
+
+    async def write(self, data: bytes):
+        self._buffer += data
+        self.size += len(data)
+        now = time.monotonic()
+        if now - self._last_checkpoint >= self.checkpoint_seconds:
+            await self.checkpoint()
+        elif len(self._buffer) >= self.flush_bytes or now - self._last_flush >= self.flush_seconds:
+            await self.flush()
+
+    async def flush(self):
+        """Hand buffered chunks to the OS in one write."""
+        async with self._lock:
+            if self._file is None:
+                return
+            self._last_flush = time.monotonic()
+            if not self._buffer:
+                return
+            data = bytes(self._buffer)
+            self._buffer.clear()
+            await asyncio.to_thread(self._write, data)
+
+    async def checkpoint(self):
+        """Flush and fsync, so the file on disk is complete and durable."""
+        await self.flush()
+        async with self._lock:
+            if self._file is None:
+                return
+            self._last_checkpoint = time.monotonic()
+            await asyncio.to_thread(self._sync)
+        logger.debug(f"[AUDIO] Checkpointed {self.path} ({self.size} bytes)")
+
+    async def close(self):
+        await self.checkpoint()
+        async with self._lock:
+            if self._file is not None:
+                await asyncio.to_thread(self._file.close)
+                self._file = None
+
+    def _write(self, data: bytes):
+        self._file.write(data)
+        self._file.flush()
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
@@ -0,0 +1,229 @@
+import asyncio
+import os
+import time
+import wave
+import logging
+from typing import Dict, List, Optional
+from app.config import settings
+from app.db import async_session
+from app.models.meeting import Meeting
+from app.models.transcription import Transcription
+from app.services.audio_processor import audio_processor
+from app.services.transcription_service import build_segments, get_transcript_end, save_transcription
+from app.services.stream_decoder import StreamDecoder, SAMPLE_RATE, SAMPLE_WIDTH, CHANNELS
+
+logger = logging.getLogger(__name__)
+
+class MeetingWindowState:
+    """Per-meeting progress of the incremental transcription pipeline."""
+    def __init__(self):
+        self.connections = 0
+        self.bytes_received = 0
+        self.bytes_at_last_window = 0
+        # Seconds of recording whose words have already been saved
+        self.committed_until = 0.0
+        # Meeting time at which this recording starts; non-zero when audio resumes after finalization
+        self.time_base = 0.0
+        # Sink and decoder are open; they stay open across reconnects until the meeting is finalized
+        self.live = False
+        self.finishing = False
+        self.finished = asyncio.Event()
+        self.idle_since: Optional[float] = None
+        self.lock = asyncio.Lock()
+        self.task: Optional[asyncio.Task] = None
+        self.watcher: Optional[asyncio.Task] = None
+
+class IncrementalTranscriber:
+    """Transcribes only newly arrived audio for live meetings.
+
+    Each window starts a little before the last committed word so that words
+    cut at the edge are heard in full; only words past the committed offset
+    are saved, so every window produces a new, non-overlapping row.
+
+    When the last audio connection closes the recording, decoder and offsets
+    are kept, so a client that reconnects mid-meeting continues the same
+    recording. The final window runs once the meeting has ended (whichever
+    process ended it) or nobody reconnected within the grace period.
+    """
+    def __init__(self, window_bytes: int, overlap_seconds: float,
+                 reconnect_grace: float, idle_poll_seconds: float):
+        self.window_bytes = window_bytes
+        self.overlap_seconds = overlap_seconds
+        self.reconnect_grace = reconnect_grace
+        self.idle_poll_seconds = idle_poll_seconds
+        self.states: Dict[str, MeetingWindowState] = {}
+
+    async def open(self, meeting_id: str):
+        """Register an audio connection for a meeting and start its live decoder."""
+        state = self.states.get(meeting_id)
+        if state and state.finishing:
+            # Let the final window release the recording before a new one starts
+            await state.finished.wait()
+            state = self.states.get(meeting_id)
+        if state is None or state.finishing:
+            state = MeetingWindowState()
+            self.states[meeting_id] = state
+            # Audio after a finalized recording continues the meeting's timeline
+            state.time_base = await get_transcript_end(meeting_id)
+        state.connections += 1
+        state.idle_since = None
+        if not state.live:
+            state.live = True
+            await audio_processor.open_sink(meeting_id)
+            await audio_processor.start_stream(meeting_id)
+
+    def add_chunk(self, meeting_id: str, size: int):
+        """Account for a saved chunk and schedule a window once enough audio arrived."""
+        state = self.states.get(meeting_id)
+        if not state or state.finishing:
+            # Audio arriving after the recording was finalized is not transcribed live
+            return
+        state.bytes_received += size
+        if state.bytes_received - state.bytes_at_last_window < self.window_bytes:
+            return
+        if state.task and not state.task.done():
+            return
+        state.task = asyncio.create_task(self._run_window_safe(meeting_id, final=False))
+
+    async def close(self, meeting_id: str):
+        """Unregister a connection; once the last one is gone, wait for a reconnect or the meeting end."""
+        state = self.states.get(meeting_id)
+        if not state or state.finishing:
+            return
+        state.connections -= 1
+        if state.connections > 0:
+            return
+        state.idle_since = time.monotonic()
+        if state.watcher is None or state.watcher.done():
+            state.watcher = asyncio.create_task(self._finish_when_idle(meeting_id, state))
+
+    async def _finish_when_idle(self, meeting_id: str, state: MeetingWindowState):
+        while state.connections == 0:
+            if time.monotonic() - state.idle_since >= self.reconnect_grace:
+                logger.info(f"[TRANSCRIBE] No reconnect for meeting {meeting_id}, finalizing its recording")
+                break
+            try:
+                if not await self._meeting_active(meeting_id):
+                    break
+            except Exception as e:
+                logger.warning(f"[TRANSCRIBE] Could not check status of meeting {meeting_id}: {e}")
+            await asyncio.sleep(self.idle_poll_seconds)
+        if state.connections == 0 and self.states.get(meeting_id) is state:
+            await self.finish(meeting_id)
+
+    @staticmethod
+    async def _meeting_active(meeting_id: str) -> bool:
+        async with async_session() as s:
+            meeting = await s.get(Meeting, meeting_id)
+        return meeting is not None and meeting.status == "active"
+
+    async def finish(self, meeting_id: str):
+        """Flush the remaining audio as the final window and drop the meeting's recording."""
+        state = self.states.get(meeting_id)
+        if not state or state.finishing:
+            return
+        state.finishing = True
+        try:
+            if state.task:
+                await asyncio.gather(state.task, return_exceptions=True)
+            await audio_processor.close_sink(meeting_id)
+            stream = await audio_processor.stop_stream(meeting_id)
+            await self._run_window_safe(meeting_id, final=True, stream=stream)
+            try:
+                os.remove(os.path.join(audio_processor.recordings_dir, f"{meeting_id}_all.webm"))
+            except OSError:
+                pass
+        finally:
+            if self.states.get(meeting_id) is state:
+                del self.states[meeting_id]
+            state.finished.set()
+
+    async def _run_window_safe(self, meeting_id: str, final: bool, stream: Optional[StreamDecoder] = None):
+        try:
+            await self.run_window(meeting_id, final, stream)
+        except Exception as e:
+            logger.error(f"[TRANSCRIBE] Window failed for meeting {meeting_id}: {e}", exc_info=True)
+
+    async def run_window(self, meeting_id: str, final: bool = False,
+                         stream: Optional[StreamDecoder] = None) -> Optional[Transcription]:
+        """Transcribe audio since the last committed offset and save only the new words."""
+        state = self.states.get(meeting_id)
+        if not state:
+            return None
+        stream = stream or audio_processor.streams.get(meeting_id)
+        async with state.lock:
+            end_bytes = state.bytes_received
+            if end_bytes <= state.bytes_at_last_window:
+                return None
+            state.bytes_at_last_window = end_bytes
+            start = max(0.0, state.committed_until - self.overlap_seconds)
+            if stream:
+                # Read the window straight from the live decoder's PCM buffer
+                start = max(start, stream.buffered_from)
+                window_end = stream.decoded_seconds
+                wav_path = self.write_window(meeting_id, stream.read_seconds(start, window_end))
+            else:
+                wav_path = await audio_processor.transcode_meeting_audio(meeting_id, start=start)
+                window_end = start + audio_processor.get_audio_duration(wav_path)
+            try:
+                result = await audio_processor.transcribe_audio(wav_path)
+            finally:
+                try:
+                    os.remove(wav_path)
+                except OSError:
+                    pass
+
+            words, state.committed_until = self.stitch(
+                result, start, window_end, state.committed_until, final
+            )
+            if words is None:
+                # No word timings: the whole window is new text
+                text, segments = result.get("text", ""), []
+            else:
+                text = " ".join(w.get("punctuated_word") or w["word"] for w in words)
+                segments = build_segments(words, offset=state.time_base + start)
+            if not text.strip():
+                return None
+            transcription = await save_transcription(meeting_id, text, segments)
+            logger.info(f"[TRANSCRIBE] Saved window for meeting {meeting_id} up to {state.committed_until:.2f}s")
+            return transcription
+
+    def write_window(self, meeting_id: str, pcm: bytes) -> str:
+        """Wrap a window of decoded PCM in a WAV header for upload."""
+        wav_path = os.path.join(audio_processor.recordings_dir, f"{meeting_id}_window.wav")
+        with wave.open(wav_path, 'wb') as w:
+            w.setnchannels(CHANNELS)
+            w.setsampwidth(SAMPLE_WIDTH)
+            w.setframerate(SAMPLE_RATE)
+            w.writeframes(pcm)
+        return wav_path
+
+    def stitch(self, result: dict, start: float, window_end: float,
+               committed_until: float, final: bool) -> tuple:
+        """Pick the words of a window that are new. Returns (words or None, new committed offset)."""
+        words: List[dict] = result.get("words") or []
+        if not words:
+            return None, max(committed_until, window_end)
+
+        # Words near the end of a live window are deferred to the next one; the final
+        # window has no successor, so words running past its nominal end are kept too
+        limit = float("inf") if final else window_end - self.overlap_seconds
+        accepted = []
+        new_until = window_end if final else limit
+        for w in words:
+            word_start = start + w["start"]
+            word_end = start + w["end"]
+            if word_end > limit:
+                new_until = min(new_until, word_start)
+                break
+            if word_start >= committed_until:
+                accepted.append(w)
+        return accepted, max(committed_until, new_until)
+
+# Global instance
+incremental_transcriber = IncrementalTranscriber(
+    settings.TRANSCRIBE_WINDOW_BYTES,
+    settings.TRANSCRIBE_OVERLAP_SECONDS,
+    settings.TRANSCRIBE_RECONNECT_GRACE_SECONDS,
+    settings.TRANSCRIBE_IDLE_POLL_SECONDS
+)
@@ -0,0 +1,247 @@
+import asyncio
+import uuid
+import logging
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import and_, bindparam, or_, update
+from sqlmodel import select, func
+from app.config import settings
+from app.db import async_session
+from app.models.insight import Insight
+from app.models.insight_backfill import InsightBackfill
+from app.models.meeting import Meeting
+from app.models.pipeline_job import PipelineJob
+from app.services.insight_generator import generate_sections, parse_insights_response
+from app.services.job_queue import job_queue, PRIORITY_BACKFILL
+from app.services.read_cache import invalidate_summary
+from app.utils.openai_client import insights_fingerprint, FALLBACK_INSIGHTS
+
+logger = logging.getLogger(__name__)
+
+class InsightBackfiller:
+    """Regenerates insights for many meetings, e.g. after a prompt or model change.
+
+    A run walks the matching meetings in (created_at, id) order, one batch at
+    a time. Each batch is summarized with at most `concurrency` meetings in
+    flight and written in one transaction together with the run's cursor and
+    counters, so a run that is interrupted resumes after its last batch.
+    """
+    async def create(self, filters: dict, concurrency: int, batch_size: int) -> InsightBackfill:
+        run = InsightBackfill(
+            id=str(uuid.uuid4()),
+            filters=filters,
+            concurrency=max(1, min(concurrency, settings.BACKFILL_MAX_CONCURRENCY)),
+            batch_size=max(1, batch_size)
+        )
+        async with async_session() as s:
+            s.add(run)
+            await s.commit()
+        await self.enqueue(run.id)
+        return run
+
+    async def enqueue(self, run_id: str) -> PipelineJob:
+        return await job_queue.enqueue(
+            "backfill", None, {"backfill_id": run_id}, PRIORITY_BACKFILL,
+            dedupe_key=f"backfill:{run_id}", reuse=("queued", "running")
+        )
+
+    async def get(self, run_id: str) -> Optional[InsightBackfill]:
+        async with async_session() as s:
+            return await s.get(InsightBackfill, run_id)
+
+    async def list_runs(self, limit: int = 50) -> List[InsightBackfill]:
+        async with async_session() as s:
+            return (await s.exec(
+                select(InsightBackfill).order_by(InsightBackfill.created_at.desc()).limit(limit)
+            )).all()
+
+    async def cancel(self, run_id: str) -> Optional[InsightBackfill]:
+        """Stop a run after its current batch."""
+        await self._set_status(run_id, "cancelled", ("queued", "running"))
+        return await self.get(run_id)
+
+    async def resume(self, run_id: str) -> Optional[InsightBackfill]:
+        """Continue a cancelled or failed run from its cursor."""
+        if await self._set_status(run_id, "queued", ("cancelled", "failed")):
+            await self.enqueue(run_id)
+        return await self.get(run_id)
+
+    async def _set_status(self, run_id: str, status: str, from_statuses: tuple) -> bool:
+        async with async_session() as s:
+            result = await s.exec(
+                update(InsightBackfill)
+                .where(InsightBackfill.id == run_id)
+                .where(InsightBackfill.status.in_(from_statuses))
+                .values(status=status, updated_at=datetime.utcnow())
+            )
+            await s.commit()
+            return bool(result.rowcount)
+
+    async def progress(self, run: InsightBackfill) -> dict:
+        """Counters, throughput and the number of matching meetings still ahead of the cursor."""
+        end = run.finished_at or datetime.utcnow()
+        elapsed = (end - run.started_at).total_seconds() if run.started_at else 0.0
+        async with async_session() as s:
+            remaining = (await s.exec(
+                select(func.count()).select_from(self._query(run).subquery())
+            )).one()
+        return {
+            **run.model_dump(),
+            "remaining": remaining,
+            "elapsed_seconds": round(elapsed, 1),
+            "meetings_per_minute": round(run.processed / elapsed * 60, 2) if elapsed > 0 else None,
+        }
+
+    def _query(self, run: InsightBackfill):
+        """Matching meetings after the cursor, with their current insight if any."""
+        filters = run.filters
+        query = (
+            select(Meeting.id, Meeting.created_at, Insight.id)
+            .join(Insight, Insight.meeting_id == Meeting.id, isouter=True)
+        )
+        if filters.get("created_from"):
+            query = query.where(Meeting.created_at >= datetime.fromisoformat(filters["created_from"]))
+        if filters.get("created_to"):
+            query = query.where(Meeting.created_at < datetime.fromisoformat(filters["created_to"]))
+        if filters.get("status"):
+            query = query.where(Meeting.status == filters["status"])
+        selection = filters.get("select", "outdated")
+        if selection == "missing":
+            query = query.where(Insight.id.is_(None))
+        elif selection == "outdated":
+            query = query.where(or_(
+                Insight.id.is_(None),
+                Insight.version.is_(None),
+                Insight.version != insights_fingerprint()
+            ))
+        if run.cursor_created_at is not None:
+            query = query.where(or_(
+                Meeting.created_at > run.cursor_created_at,
+                and_(Meeting.created_at == run.cursor_created_at, Meeting.id > run.cursor_meeting_id)
+            ))
+        return query
+
+    async def run(self, run_id: str):
+        """Process a run batch by batch until it is done or cancelled."""
+        async with async_session() as s:
+            run = await s.get(InsightBackfill, run_id)
+            if not run or run.status in ("completed", "cancelled"):
+                return
+            run.status = "running"
+            run.started_at = run.started_at or datetime.utcnow()
+            s.add(run)
+            await s.commit()
+        logger.info(f"[BACKFILL] Starting run {run_id}")
+        try:
+            while True:
+                run = await self.get(run_id)
+                if run.status == "cancelled":
+                    logger.info(f"[BACKFILL] Run {run_id} cancelled after {run.processed} meetings")
+                    return
+                batch = await self._next_batch(run)
+                if not batch:
+                    break
+                await self._process_batch(run, batch)
+        except Exception as e:
+            await self._finish(run_id, "failed", str(e))
+            raise
+        await self._finish(run_id, "completed")
+        logger.info(f"[BACKFILL] Run {run_id} completed")
+
+    async def _next_batch(self, run: InsightBackfill) -> list:
+        async with async_session() as s:
+            rows = (await s.exec(
+                self._query(run).order_by(Meeting.created_at, Meeting.id).limit(run.batch_size)
+            )).all()
+        # A meeting with several insight rows appears once per row; keep the first
+        seen, batch = set(), []
+        for meeting_id, created_at, insight_id in rows:
+            if meeting_id not in seen:
+                seen.add(meeting_id)
+                batch.append((meeting_id, created_at, insight_id))
+        return batch
+
+    async def _process_batch(self, run: InsightBackfill, batch: list):
+        semaphore = asyncio.Semaphore(run.concurrency)
+        failed_sections = parse_insights_response(FALLBACK_INSIGHTS)
+
+        async def generate(meeting_id: str):
+            async with semaphore:
+                try:
+                    sections = await generate_sections(meeting_id, stream=False)
+                except Exception as e:
+                    logger.error(f"[BACKFILL] Meeting {meeting_id} failed: {e}")
+                    return "failed"
+                if sections is None:
+                    return None
+                return "failed" if sections == failed_sections else sections
+
+        results = await asyncio.gather(*(generate(meeting_id) for meeting_id, _, _ in batch))
+        await self._write_batch(run, batch, results)
+        await invalidate_summary(*(meeting_id for meeting_id, _, _ in batch))
+        logger.info(f"[BACKFILL] Run {run.id}: {run.processed + len(batch)} meetings processed")
+
+    async def _write_batch(self, run: InsightBackfill, batch: list, results: list):
+        """Write a batch of insights (with executemany), the cursor and the counters in one transaction."""
+        version = insights_fingerprint()
+        now = datetime.utcnow()
+        updates, inserts = [], []
+        succeeded = skipped = failed = 0
+        for (meeting_id, _, insight_id), result in zip(batch, results):
+            if result is None:
+                skipped += 1
+                continue
+            if result == "failed":
+                failed += 1
+                continue
+            summary, action_items, decisions = result
+            succeeded += 1
+            if insight_id:
+                updates.append({"b_id": insight_id, "b_summary": summary, "b_action_items": action_items,
+                                "b_decisions": decisions})
+            else:
+                inserts.append({"id": str(uuid.uuid4()), "meeting_id": meeting_id, "summary": summary,
+                                "action_items": action_items, "decisions": decisions,
+                                "version": version, "created_at": now})
+        table = Insight.__table__
+        last_meeting_id, last_created_at, _ = batch[-1]
+        async with async_session() as s:
+            if updates:
+                await s.execute(
+                    table.update()
+                    .where(table.c.id == bindparam("b_id"))
+                    .values(summary=bindparam("b_summary"), action_items=bindparam("b_action_items"),
+                            decisions=bindparam("b_decisions"), version=version),
+                    updates
+                )
+            if inserts:
+                await s.execute(table.insert(), inserts)
+            await s.exec(
+                update(InsightBackfill)
+                .where(InsightBackfill.id == run.id)
+                .values(
+                    cursor_created_at=last_created_at,
+                    cursor_meeting_id=last_meeting_id,
+                    processed=InsightBackfill.processed + len(batch),
+                    succeeded=InsightBackfill.succeeded + succeeded,
+                    skipped=InsightBackfill.skipped + skipped,
+                    failed=InsightBackfill.failed + failed,
+                    updated_at=now
+                )
+            )
+            await s.commit()
+        run.processed += len(batch)
+
+    async def _finish(self, run_id: str, status: str, error: Optional[str] = None):
+        now = datetime.utcnow()
+        async with async_session() as s:
+            await s.exec(
+                update(InsightBackfill)
+                .where(InsightBackfill.id == run_id)
+                .where(InsightBackfill.status == "running")
+                .values(status=status, error=error, finished_at=now, updated_at=now)
+            )
+            await s.commit()
+
+# Global instance
+insight_backfiller = InsightBackfiller()
@@ -0,0 +1,101 @@
+import hashlib
+import re
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from sqlmodel import select, func, delete
+from app.config import settings
+from app.db import async_session
+from app.models.insight_cache import InsightCacheEntry
+from app.utils.openai_client import insights_fingerprint
+
+logger = logging.getLogger(__name__)
+
+def normalize_transcript(transcript: str) -> str:
+    """Collapse whitespace so formatting-only differences share a cache entry."""
+    return re.sub(r"\s+", " ", transcript).strip()
+
+def insight_cache_key(transcript: str) -> str:
+    data = f"{insights_fingerprint()}\n{normalize_transcript(transcript)}"
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+class InsightCache:
+    """Two-tier cache of parsed insights (summary, action items, decisions).
+
+    An in-process LRU answers repeats within a worker; the database tier is
+    shared by all workers and survives restarts. Database entries expire after
+    INSIGHT_CACHE_TTL_DAYS and the least recently used ones are evicted once
+    there are more than INSIGHT_CACHE_DB_MAX_ENTRIES.
+    """
+    def __init__(self, memory_size: int, db_max_entries: int, ttl_days: int):
+        self.memory_size = memory_size
+        self.db_max_entries = db_max_entries
+        self.ttl = timedelta(days=ttl_days)
+        self.memory: "OrderedDict[str, Tuple[str, str, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[Tuple[str, str, str]]:
+        sections = self.memory.get(key)
+        if sections:
+            self.memory.move_to_end(key)
+            self.hits += 1
+            return sections
+        async with async_session() as s:
+            entry = await s.get(InsightCacheEntry, key)
+            if entry and datetime.utcnow() - entry.created_at > self.ttl:
+                await s.delete(entry)
+                await s.commit()
+                entry = None
+            if not entry:
+                self.misses += 1
+                return None
+            entry.hits += 1
+            entry.last_used_at = datetime.utcnow()
+            s.add(entry)
+            await s.commit()
+            sections = (entry.summary, entry.action_items, entry.decisions)
+        self._remember(key, sections)
+        self.hits += 1
+        return sections
+
+    async def put(self, key: str, sections: Tuple[str, str, str]):
+        self._remember(key, sections)
+        summary, action_items, decisions = sections
+        async with async_session() as s:
+            entry = await s.get(InsightCacheEntry, key) or InsightCacheEntry(key=key, fingerprint=insights_fingerprint())
+            entry.summary = summary
+            entry.action_items = action_items
+            entry.decisions = decisions
+            entry.last_used_at = datetime.utcnow()
+            s.add(entry)
+            await s.commit()
+        await self.evict()
+
+    async def evict(self):
+        """Drop expired entries and trim the table to its size limit."""
+        async with async_session() as s:
+            await s.exec(delete(InsightCacheEntry).where(InsightCacheEntry.created_at < datetime.utcnow() - self.ttl))
+            count = (await s.exec(select(func.count()).select_from(InsightCacheEntry))).one()
+            excess = count - self.db_max_entries
+            if excess > 0:
+                oldest = (await s.exec(
+                    select(InsightCacheEntry.key).order_by(InsightCacheEntry.last_used_at).limit(excess)
+                )).all()
+                await s.exec(delete(InsightCacheEntry).where(InsightCacheEntry.key.in_(oldest)))
+                logger.info(f"[INSIGHT CACHE] Evicted {len(oldest)} entries")
+            await s.commit()
+
+    def _remember(self, key: str, sections: Tuple[str, str, str]):
+        self.memory[key] = sections
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_size:
+            self.memory.popitem(last=False)
+
+# Global instance
+insight_cache = InsightCache(
+    settings.INSIGHT_CACHE_MEMORY_SIZE,
+    settings.INSIGHT_CACHE_DB_MAX_ENTRIES,
+    settings.INSIGHT_CACHE_TTL_DAYS
+)
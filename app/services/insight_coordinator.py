@@ -0,0 +1,156 @@
+import asyncio
+import os
+import socket
+import uuid
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from app.config import settings
+from app.db import async_session
+from app.models.insight import Insight
+from app.models.insight_lease import InsightLease
+
+logger = logging.getLogger(__name__)
+
+class InsightCoordinator:
+    """Single-flight insight generation per meeting.
+
+    Requests for a meeting that is already being generated in this process
+    share its task. Across worker processes a lease row decides who runs the
+    generation; the others poll until the insight appears. A worker that dies
+    stops renewing its lease, so another one takes over once it expires.
+    """
+    def __init__(self, lease_seconds: float, poll_seconds: float):
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.tasks: Dict[str, asyncio.Task] = {}
+
+    def start(self, meeting_id: str, live: bool = False) -> asyncio.Task:
+        """Start generation for a meeting, or return the generation already in flight."""
+        task = self.tasks.get(meeting_id)
+        if task is None:
+            task = asyncio.create_task(self._run(meeting_id, live))
+            self.tasks[meeting_id] = task
+            task.add_done_callback(lambda t: self._forget(meeting_id, t))
+        return task
+
+    async def generate(self, meeting_id: str, live: bool = False) -> Optional[Insight]:
+        """Generate insights for a meeting, sharing any generation already in flight."""
+        # Shielded so one caller giving up does not cancel the others
+        return await asyncio.shield(self.start(meeting_id, live))
+
+    def _forget(self, meeting_id: str, task: asyncio.Task):
+        if self.tasks.get(meeting_id) is task:
+            del self.tasks[meeting_id]
+
+    async def _run(self, meeting_id: str, live: bool) -> Optional[Insight]:
+        waited_on = None
+        while True:
+            insight = await self._get_insight(meeting_id)
+            if insight:
+                return insight
+            lease = await self._get_lease(meeting_id)
+            if waited_on and lease and lease.started_at == waited_on and lease.status == "failed":
+                # The worker we were waiting on gave up; don't retry on its behalf
+                return None
+            if await self._acquire(meeting_id):
+                break
+            if waited_on is None:
+                logger.info(f"[INSIGHTS] Waiting for another worker generating insights for meeting {meeting_id}")
+            waited_on = lease.started_at if lease else None
+            await asyncio.sleep(self.poll_seconds)
+
+        from app.services.insight_generator import generate_and_save
+        heartbeat = asyncio.create_task(self._renew(meeting_id))
+        insight = None
+        try:
+            # Another worker may have finished between our check and the lease
+            insight = await self._get_insight(meeting_id)
+            if insight is None:
+                insight = await generate_and_save(meeting_id, live)
+        finally:
+            heartbeat.cancel()
+            await self._release(
+                meeting_id,
+                "completed" if insight else "failed",
+                None if insight else "Insight generation produced no result"
+            )
+        return insight
+
+    async def _get_insight(self, meeting_id: str) -> Optional[Insight]:
+        async with async_session() as s:
+            return (await s.exec(select(Insight).where(Insight.meeting_id == meeting_id))).first()
+
+    async def _get_lease(self, meeting_id: str) -> Optional[InsightLease]:
+        async with async_session() as s:
+            return await s.get(InsightLease, meeting_id)
+
+    async def _acquire(self, meeting_id: str) -> bool:
+        """Take the lease if nobody holds it or the holder's lease expired."""
+        now = datetime.utcnow()
+        values = {
+            "owner": self.owner,
+            "status": "running",
+            "error": None,
+            "started_at": now,
+            "expires_at": now + timedelta(seconds=self.lease_seconds),
+        }
+        async with async_session() as s:
+            result = await s.exec(
+                update(InsightLease)
+                .where(InsightLease.meeting_id == meeting_id)
+                .where(or_(InsightLease.status != "running", InsightLease.expires_at < now))
+                .values(**values)
+            )
+            if result.rowcount:
+                await s.commit()
+                return True
+            if await s.get(InsightLease, meeting_id):
+                return False
+            s.add(InsightLease(meeting_id=meeting_id, **values))
+            try:
+                await s.commit()
+            except IntegrityError:
+                # Another worker inserted the lease first
+                return False
+        return True
+
+    async def _renew(self, meeting_id: str):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            renewed = await self._extend(meeting_id)
+            if not renewed:
+                logger.warning(f"[INSIGHTS] Lost insight lease for meeting {meeting_id}")
+                return
+
+    async def _extend(self, meeting_id: str) -> bool:
+        async with async_session() as s:
+            result = await s.exec(
+                update(InsightLease)
+                .where(InsightLease.meeting_id == meeting_id)
+                .where(InsightLease.owner == self.owner)
+                .where(InsightLease.status == "running")
+                .values(expires_at=datetime.utcnow() + timedelta(seconds=self.lease_seconds))
+            )
+            await s.commit()
+            return bool(result.rowcount)
+
+    async def _release(self, meeting_id: str, status: str, error: Optional[str] = None):
+        async with async_session() as s:
+            await s.exec(
+                update(InsightLease)
+                .where(InsightLease.meeting_id == meeting_id)
+                .where(InsightLease.owner == self.owner)
+                .values(status=status, error=error, expires_at=datetime.utcnow())
+            )
+            await s.commit()
+
+# Global instance
+insight_coordinator = InsightCoordinator(
+    settings.INSIGHT_LEASE_SECONDS,
+    settings.INSIGHT_LEASE_POLL_SECONDS
+)
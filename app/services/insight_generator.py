@@ -1,39 +1,40 @@
 import uuid
-import asyncio
-from sqlmodel import Session, select
-from app.db import engine
-from app.models.transcription import Transcription
+import time
+from typing import Optional
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from app.config import settings
+from app.db import async_session
 from app.models.insight import Insight
-from app.utils.openai_client import get_insights_from_transcript
+from app.models.pipeline_job import PipelineJob
+from app.services.insight_cache import insight_cache, insight_cache_key
+from app.services.insight_coordinator import insight_coordinator
+from app.services.job_queue import job_queue, JOB_STATUSES, PRIORITY_DEFAULT
+from app.services.live_summarizer import live_summarizer
+from app.services.read_cache import invalidate_summary
+from app.services.transcription_service import get_transcript_text
+from app.utils.openai_client import get_insights_from_transcript, insights_fingerprint, FALLBACK_INSIGHTS
 import logging
 
 logger = logging.getLogger(__name__)
 
-async def generate_and_save(meeting_id: str):
+async def generate_and_save(meeting_id: str, live: bool = False):
     """Generate insights from meeting transcription and save to database"""
     try:
-        # Get all transcriptions for the meeting
-        with Session(engine) as s:
-            transcriptions = s.exec(
-                select(Transcription).where(Transcription.meeting_id == meeting_id)
-            ).all()
-            
-        if not transcriptions:
-            logger.warning(f"No transcriptions found for meeting {meeting_id}")
-            return None
-            
-        # Combine all transcription content
-        full_transcript = "\n".join([t.content for t in transcriptions])
-        
-        if not full_transcript.strip():
-            logger.warning(f"Empty transcript for meeting {meeting_id}")
-            return None
-            
-        # Generate insights using OpenAI
-        insights = await get_insights_from_transcript(full_transcript)
-        
-        # Parse the structured response
-        summary, action_items, decisions = parse_insights_response(insights)
+        # A meeting summarized while live only needs its final delta folded in
+        sections = None
+        if live:
+            try:
+                live_analysis = await live_summarizer.finish(meeting_id)
+                if live_analysis:
+                    sections = parse_insights_response(live_analysis)
+            except Exception as e:
+                logger.error(f"Failed to finish live summary for meeting {meeting_id}, running full pass: {e}")
+        if sections is None:
+            sections = await generate_sections(meeting_id)
+            if sections is None:
+                return None
+        summary, action_items, decisions = sections
         
         # Create and save insight
         insight = Insight(
@@ -41,15 +42,23 @@ async def generate_and_save(meeting_id: str):
             meeting_id=meeting_id,
             summary=summary,
             action_items=action_items,
-            decisions=decisions
+            decisions=decisions,
+            version=insights_fingerprint()
         )
         
-        with Session(engine) as s:
+        async with async_session() as s:
             s.add(insight)
-            s.commit()
-            s.refresh(insight)
+            try:
+                await s.commit()
+            except IntegrityError:
+                # Meetings have at most one insight; another writer saved it first
+                await s.rollback()
+                existing = (await s.exec(select(Insight).where(Insight.meeting_id == meeting_id))).first()
+                logger.info(f"Insights for meeting {meeting_id} were already saved")
+                return existing
+        await invalidate_summary(meeting_id)
             
-        # Broadcast summary to WebSocket clients
+        # Broadcast summary to WebSocket clients; this runs in the worker, so it goes through the DB feed
         try:
             from app.services.websocket_manager import broadcast_summary
             await broadcast_summary(meeting_id, {
@@ -68,6 +77,105 @@ async def generate_and_save(meeting_id: str):
         logger.error(f"[INSIGHT GENERATION ERROR] for meeting {meeting_id}: {e}", exc_info=True)
         return None
 
+async def generate_sections(meeting_id: str, stream: bool = True):
+    """Summarize the full transcript. Returns (summary, action_items, decisions), or None if empty.
+
+    With stream the sections are pushed to /ws/summary clients while they are generated.
+    """
+    # Get the meeting transcript, in time order with speaker labels
+    full_transcript = await get_transcript_text(meeting_id)
+    
+    if not full_transcript.strip():
+        logger.warning(f"Empty transcript for meeting {meeting_id}")
+        return None
+        
+    # Reuse insights already generated for the same transcript, prompt and model
+    cache_key = insight_cache_key(full_transcript)
+    cached = await insight_cache.get(cache_key)
+    if cached:
+        logger.info(f"Insight cache hit for meeting {meeting_id}")
+        return cached
+        
+    # Generate insights using OpenAI, pushing the sections to clients as they stream in
+    streamer = SectionStreamer(meeting_id, settings.SUMMARY_STREAM_PUBLISH_SECONDS) if stream else None
+    insights = await get_insights_from_transcript(full_transcript, streamer.feed if streamer else None)
+    
+    # Parse the structured response
+    sections = parse_insights_response(insights)
+    if insights != FALLBACK_INSIGHTS:
+        await insight_cache.put(cache_key, sections)
+    return sections
+
+# Headings that start each section of the insights response
+SECTION_HEADINGS = {
+    "meeting summary": "summary",
+    "summary": "summary",
+    "action items": "action_items",
+    "key decisions": "decisions",
+    "decisions": "decisions",
+}
+SECTION_ORDER = ["summary", "action_items", "decisions"]
+
+class SectionParser:
+    """Splits insights text into its sections as it streams in.
+
+    Sections switch on their headings or on the '---' separators, so partial
+    output can be shown before the whole response arrived. Heading lines stay
+    in the section text, as they do in parse_insights_response.
+    """
+    def __init__(self):
+        self.sections = {name: "" for name in SECTION_ORDER}
+        self.current = "summary"
+        # Text after the last newline; it may still turn out to be a separator
+        self.pending = ""
+
+    def feed(self, delta: str):
+        self.pending += delta
+        *lines, self.pending = self.pending.split("\n")
+        for line in lines:
+            self._add_line(line)
+
+    def _add_line(self, line: str):
+        stripped = line.strip()
+        if stripped == "---":
+            index = SECTION_ORDER.index(self.current)
+            self.current = SECTION_ORDER[min(index + 1, len(SECTION_ORDER) - 1)]
+            return
+        if stripped.startswith("#"):
+            heading = stripped.lstrip("#").strip().rstrip(":").lower()
+            self.current = SECTION_HEADINGS.get(heading, self.current)
+        self.sections[self.current] += line + "\n"
+
+    def snapshot(self) -> dict:
+        sections = dict(self.sections)
+        pending = self.pending.strip()
+        # Hold back what could still become a separator or a heading
+        if pending and set(pending) != {"-"} and not pending.startswith("#"):
+            sections[self.current] += self.pending
+        return {name: text.strip() for name, text in sections.items()}
+
+class SectionStreamer:
+    """Feeds streamed insight text to a SectionParser and publishes the sections at most every interval."""
+    def __init__(self, meeting_id: str, interval: float):
+        self.meeting_id = meeting_id
+        self.interval = interval
+        self.parser = SectionParser()
+        self.last_publish = 0.0
+
+    async def feed(self, delta: str):
+        self.parser.feed(delta)
+        now = time.monotonic()
+        if now - self.last_publish < self.interval:
+            return
+        self.last_publish = now
+        from app.services.websocket_manager import broadcast_summary
+        await broadcast_summary(self.meeting_id, {
+            **self.parser.snapshot(),
+            "section": self.parser.current,
+            "summary_available": False,
+            "streaming": True
+        })
+
 def parse_insights_response(response: str) -> tuple:
     """Parse the structured response from OpenAI into separate sections. If the response is empty or generic, generate a basic summary from the transcript."""
     try:
@@ -128,10 +236,30 @@ def parse_insights_response(response: str) -> tuple:
             "Unable to extract decisions."
         )
 
-async def generate_insights_for_meeting(meeting_id: str) -> Insight:
-    """Main function to generate insights for a meeting"""
+async def generate_insights_for_meeting(meeting_id: str, live: bool = False) -> Insight:
+    """Main function to generate insights for a meeting. Concurrent callers share one generation."""
     try:
-        return await generate_and_save(meeting_id)
+        return await insight_coordinator.generate(meeting_id, live)
     except Exception as e:
         logger.error(f"[INSIGHT GENERATION ERROR - OUTER] for meeting {meeting_id}: {e}", exc_info=True)
         return None
+
+def insights_dedupe_key(meeting_id: str) -> str:
+    return f"insights:{meeting_id}"
+
+async def get_insights_job(meeting_id: str) -> Optional[PipelineJob]:
+    """Latest insight job for a meeting, whatever its status"""
+    return await job_queue.find(insights_dedupe_key(meeting_id), statuses=JOB_STATUSES)
+
+async def enqueue_insights(meeting_id: str, priority: int = PRIORITY_DEFAULT, live: bool = False) -> PipelineJob:
+    """Queue insight generation for a meeting unless it is already queued or running.
+
+    A live job starts from the analysis the live summarizer stored for the meeting.
+    """
+    payload = {"live_summary": True} if live else None
+    job = await job_queue.enqueue(
+        "insights", meeting_id, payload, priority,
+        dedupe_key=insights_dedupe_key(meeting_id), reuse=("queued", "running")
+    )
+    await invalidate_summary(meeting_id)
+    return job
@@ -0,0 +1,270 @@
+import asyncio
+import os
+import socket
+import uuid
+import logging
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional
+from sqlalchemy import and_, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from app.config import settings
+from app.db import async_session
+from app.models.pipeline_job import PipelineJob
+
+logger = logging.getLogger(__name__)
+
+# Job priorities; higher runs first
+PRIORITY_LIVE = 10
+PRIORITY_DEFAULT = 5
+PRIORITY_BACKFILL = 0
+
+JOB_STATUSES = ("queued", "running", "completed", "failed")
+
+def job_to_dict(job: PipelineJob) -> dict:
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "meeting_id": job.meeting_id,
+        "status": job.status,
+        "priority": job.priority,
+        "attempts": job.attempts,
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+    }
+
+class JobQueue:
+    """Durable pipeline job queue stored in the database.
+
+    Web workers only enqueue. Pipeline workers claim jobs of one stage at a
+    time, renew the claim while they work and retry failed jobs with backoff. A job whose worker
+    dies is claimed again once its visibility timeout passes.
+    """
+    def __init__(self, visibility_timeout: float, max_attempts: int, retry_backoff: float):
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+
+    async def enqueue(self, kind: str, meeting_id: Optional[str], payload: Optional[dict] = None,
+                priority: int = PRIORITY_DEFAULT, dedupe_key: Optional[str] = None,
+                reuse: tuple = ("queued", "running", "completed")) -> PipelineJob:
+        """Add a job, or return the job with the same dedupe key if its status is in reuse."""
+        existing = await self.find(dedupe_key, reuse)
+        if existing:
+            logger.info(f"[JOBS] Reusing {existing.kind} job {existing.id} for meeting {meeting_id}")
+            if existing.status == "queued" and priority > existing.priority:
+                # e.g. a meeting that just ended overtakes its own queued backfill
+                await self.reprioritize(existing.id, priority)
+                existing.priority = priority
+            return existing
+        job = PipelineJob(
+            id=str(uuid.uuid4()),
+            kind=kind,
+            meeting_id=meeting_id,
+            payload=payload or {},
+            priority=priority,
+            dedupe_key=dedupe_key,
+            max_attempts=self.max_attempts
+        )
+        async with async_session() as s:
+            s.add(job)
+            try:
+                await s.commit()
+            except IntegrityError:
+                # Another process enqueued the same key between the lookup and the insert
+                await s.rollback()
+                existing = await self.find(dedupe_key, JOB_STATUSES)
+                if existing is None:
+                    raise
+                logger.info(f"[JOBS] Reusing {existing.kind} job {existing.id} enqueued concurrently for meeting {meeting_id}")
+                return existing
+        logger.info(f"[JOBS] Enqueued {kind} job {job.id} for meeting {meeting_id} (priority {priority})")
+        return job
+
+    async def get(self, job_id: str) -> Optional[PipelineJob]:
+        async with async_session() as s:
+            return await s.get(PipelineJob, job_id)
+
+    async def find(self, dedupe_key: Optional[str],
+             statuses: tuple = ("queued", "running", "completed")) -> Optional[PipelineJob]:
+        """Return the latest job for a dedupe key if its status is one of statuses."""
+        if not dedupe_key:
+            return None
+        async with async_session() as s:
+            job = (await s.exec(
+                select(PipelineJob)
+                .where(PipelineJob.dedupe_key == dedupe_key)
+                .order_by(PipelineJob.created_at.desc())
+            )).first()
+        if job and job.status in statuses:
+            return job
+        return None
+
+    async def reprioritize(self, job_id: str, priority: int):
+        async with async_session() as s:
+            await s.exec(
+                update(PipelineJob)
+                .where(PipelineJob.id == job_id)
+                .where(PipelineJob.status == "queued")
+                .values(priority=priority)
+            )
+            await s.commit()
+
+    async def claim(self, kind: str, worker_id: str) -> Optional[PipelineJob]:
+        """Claim the highest priority visible job of a stage, or None if there is none."""
+        now = datetime.utcnow()
+        claimable = or_(
+            and_(PipelineJob.status == "queued", PipelineJob.available_at <= now),
+            and_(PipelineJob.status == "running", PipelineJob.locked_until < now)
+        )
+        async with async_session() as s:
+            candidates = (await s.exec(
+                select(PipelineJob.id)
+                .where(PipelineJob.kind == kind)
+                .where(claimable)
+                .order_by(PipelineJob.priority.desc(), PipelineJob.available_at)
+                .limit(5)
+            )).all()
+            for job_id in candidates:
+                # Conditional update so only one worker wins each job
+                result = await s.exec(
+                    update(PipelineJob)
+                    .where(PipelineJob.id == job_id)
+                    .where(claimable)
+                    .values(
+                        status="running",
+                        locked_by=worker_id,
+                        locked_until=now + timedelta(seconds=self.visibility_timeout),
+                        attempts=PipelineJob.attempts + 1,
+                        started_at=now
+                    )
+                )
+                if result.rowcount:
+                    await s.commit()
+                    return await s.get(PipelineJob, job_id)
+        return None
+
+    async def renew(self, job_id: str, worker_id: str) -> bool:
+        """Extend a running job's visibility timeout. False if the claim was lost."""
+        async with async_session() as s:
+            result = await s.exec(
+                update(PipelineJob)
+                .where(PipelineJob.id == job_id)
+                .where(PipelineJob.locked_by == worker_id)
+                .where(PipelineJob.status == "running")
+                .values(locked_until=datetime.utcnow() + timedelta(seconds=self.visibility_timeout))
+            )
+            await s.commit()
+            return bool(result.rowcount)
+
+    async def complete(self, job_id: str, worker_id: str, result: Optional[dict] = None):
+        async with async_session() as s:
+            await s.exec(
+                update(PipelineJob)
+                .where(PipelineJob.id == job_id)
+                .where(PipelineJob.locked_by == worker_id)
+                .values(status="completed", result=result, error=None,
+                        locked_until=None, finished_at=datetime.utcnow())
+            )
+            await s.commit()
+
+    async def fail(self, job: PipelineJob, worker_id: str, error: str):
+        """Requeue a failed job with exponential backoff, or fail it for good after max attempts."""
+        now = datetime.utcnow()
+        if job.attempts < job.max_attempts:
+            values = {
+                "status": "queued",
+                "available_at": now + timedelta(seconds=self.retry_backoff * 2 ** (job.attempts - 1)),
+                "locked_until": None,
+            }
+        else:
+            values = {"status": "failed", "locked_until": None, "finished_at": now}
+        async with async_session() as s:
+            await s.exec(
+                update(PipelineJob)
+                .where(PipelineJob.id == job.id)
+                .where(PipelineJob.locked_by == worker_id)
+                .values(error=error, **values)
+            )
+            await s.commit()
+        return values["status"]
+
+JobHandler = Callable[[PipelineJob], Awaitable[Optional[dict]]]
+
+class PipelineWorker:
+    """Runs queued jobs with a fixed number of concurrent runners per stage."""
+    def __init__(self, queue: JobQueue, handlers: Dict[str, JobHandler],
+                 concurrency: Dict[str, int], poll_seconds: float):
+        self.queue = queue
+        self.handlers = handlers
+        self.concurrency = concurrency
+        self.poll_seconds = poll_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.stopping = asyncio.Event()
+
+    async def run(self):
+        runners = [
+            asyncio.create_task(self._runner(kind))
+            for kind, count in self.concurrency.items()
+            for _ in range(count)
+        ]
+        logger.info(f"[JOBS] Worker {self.worker_id} started: {self.concurrency}")
+        try:
+            await self.stopping.wait()
+        finally:
+            # Let running jobs finish; unfinished ones are retried after their visibility timeout
+            await asyncio.gather(*runners, return_exceptions=True)
+            logger.info(f"[JOBS] Worker {self.worker_id} stopped")
+
+    def stop(self):
+        self.stopping.set()
+
+    async def _runner(self, kind: str):
+        while not self.stopping.is_set():
+            try:
+                job = await self.queue.claim(kind, self.worker_id)
+            except Exception as e:
+                logger.error(f"[JOBS] Could not claim {kind} job: {e}")
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self.stopping.wait(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._execute(job)
+
+    async def _execute(self, job: PipelineJob):
+        if job.attempts > job.max_attempts:
+            # Claimed again after its worker died on the last attempt
+            await self.queue.fail(job, self.worker_id, job.error or "Visibility timeout exceeded")
+            return
+        logger.info(f"[JOBS] Running {job.kind} job {job.id} for meeting {job.meeting_id} (attempt {job.attempts})")
+        heartbeat = asyncio.create_task(self._renew(job.id))
+        try:
+            result = await self.handlers[job.kind](job)
+        except Exception as e:
+            logger.error(f"[JOBS] {job.kind} job {job.id} for meeting {job.meeting_id} failed: {e}", exc_info=True)
+            status = await self.queue.fail(job, self.worker_id, str(e))
+            logger.info(f"[JOBS] {job.kind} job {job.id} is now {status}")
+            return
+        finally:
+            heartbeat.cancel()
+        await self.queue.complete(job.id, self.worker_id, result)
+        logger.info(f"[JOBS] Completed {job.kind} job {job.id} for meeting {job.meeting_id}")
+
+    async def _renew(self, job_id: str):
+        while True:
+            await asyncio.sleep(self.queue.visibility_timeout / 3)
+            if not await self.queue.renew(job_id, self.worker_id):
+                logger.warning(f"[JOBS] Lost claim on job {job_id}")
+                return
+
+# Global instance
+job_queue = JobQueue(
+    settings.JOB_VISIBILITY_TIMEOUT_SECONDS,
+    settings.JOB_MAX_ATTEMPTS,
+    settings.JOB_RETRY_BACKOFF_SECONDS
+)
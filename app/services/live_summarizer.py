@@ -0,0 +1,134 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from app.config import settings
+from app.db import async_session
+from app.models.meeting import Meeting
+from app.models.summary_update import SummaryUpdate
+from app.services.transcription_service import get_segments_saved_after, format_segments
+from app.utils.openai_client import update_insights
+
+logger = logging.getLogger(__name__)
+
+class LiveSummaryState:
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.task: Optional[asyncio.Task] = None
+
+class LiveSummarizer:
+    """Keeps a rolling summary of active meetings and pushes it to /ws/summary.
+
+    Every interval only the transcript segments saved since the last update
+    are folded into the running analysis, so when the meeting ends only the
+    final delta is left to process. The analysis and the last folded segment
+    are kept on the meeting's SummaryUpdate row, so the worker that generates
+    the final insights picks them up whichever process ran the live loop.
+    """
+    def __init__(self, interval: float, min_new_chars: int):
+        self.interval = interval
+        self.min_new_chars = min_new_chars
+        self.states: Dict[str, LiveSummaryState] = {}
+
+    def start(self, meeting_id: str):
+        """Start the periodic summary loop for a meeting, if not already running."""
+        state = self.states.setdefault(meeting_id, LiveSummaryState())
+        if state.task is None or state.task.done():
+            state.task = asyncio.create_task(self._run(meeting_id))
+
+    async def _run(self, meeting_id: str):
+        while True:
+            await asyncio.sleep(self.interval)
+            async with async_session() as s:
+                meeting = await s.get(Meeting, meeting_id)
+            if not meeting or meeting.status != "active":
+                # The insights job finishes the stored analysis
+                self.states.pop(meeting_id, None)
+                return
+            try:
+                await self.update(meeting_id, min_new_chars=self.min_new_chars)
+            except Exception as e:
+                logger.error(f"[LIVE SUMMARY] Update failed for meeting {meeting_id}: {e}")
+
+    @staticmethod
+    async def _load(meeting_id: str) -> Tuple[str, Optional[Tuple[datetime, str]]]:
+        """The stored analysis and the (created_at, id) of its last folded segment"""
+        async with async_session() as s:
+            row = await s.get(SummaryUpdate, meeting_id)
+        if not row or not row.live_analysis:
+            return "", None
+        return row.live_analysis, (row.live_folded_at, row.live_folded_segment_id)
+
+    @staticmethod
+    async def _save(meeting_id: str, analysis: str, folded: Tuple[datetime, str],
+                    previous: Optional[Tuple[datetime, str]]) -> bool:
+        """Store the analysis unless another process folded the same segments first."""
+        values = {"live_analysis": analysis, "live_folded_at": folded[0], "live_folded_segment_id": folded[1]}
+        async with async_session() as s:
+            result = await s.exec(
+                update(SummaryUpdate)
+                .where(SummaryUpdate.meeting_id == meeting_id)
+                .where(SummaryUpdate.live_folded_segment_id == previous[1] if previous
+                       else SummaryUpdate.live_folded_segment_id.is_(None))
+                .values(**values)
+            )
+            if result.rowcount:
+                await s.commit()
+                return True
+            if previous or await s.get(SummaryUpdate, meeting_id):
+                return False
+            s.add(SummaryUpdate(meeting_id=meeting_id, **values))
+            try:
+                await s.commit()
+            except IntegrityError:
+                await s.rollback()
+                return False
+        return True
+
+    async def update(self, meeting_id: str, min_new_chars: int = 0) -> str:
+        """Fold transcript saved since the last update into the running analysis."""
+        state = self.states.setdefault(meeting_id, LiveSummaryState())
+        async with state.lock:
+            analysis, folded = await self._load(meeting_id)
+            segments = await get_segments_saved_after(meeting_id, folded)
+            new_text = format_segments(sorted(segments, key=lambda seg: seg.start))
+            if not new_text.strip() or len(new_text) < min_new_chars:
+                return analysis
+            updated = await update_insights(analysis, new_text)
+            last = segments[-1]
+            if not await self._save(meeting_id, updated, (last.created_at, last.id), folded):
+                logger.info(f"[LIVE SUMMARY] Summary of meeting {meeting_id} was updated elsewhere, discarding this one")
+                return (await self._load(meeting_id))[0]
+        logger.info(f"[LIVE SUMMARY] Folded {len(segments)} segments into the summary of meeting {meeting_id}")
+
+        from app.services.insight_generator import parse_insights_response
+        from app.services.websocket_manager import broadcast_summary
+        summary, action_items, decisions = parse_insights_response(updated)
+        await broadcast_summary(meeting_id, {
+            "summary": summary,
+            "action_items": action_items,
+            "decisions": decisions,
+            "summary_available": False,
+            "live": True
+        })
+        return updated
+
+    async def finish(self, meeting_id: str) -> Optional[str]:
+        """Fold the rest of the transcript into the stored analysis. None if the meeting has none."""
+        analysis, _ = await self._load(meeting_id)
+        if not analysis:
+            return None
+        try:
+            return await self.update(meeting_id)
+        finally:
+            state = self.states.get(meeting_id)
+            if state and (state.task is None or state.task.done()):
+                self.states.pop(meeting_id, None)
+
+# Global instance
+live_summarizer = LiveSummarizer(
+    settings.LIVE_SUMMARY_INTERVAL_SECONDS,
+    settings.LIVE_SUMMARY_MIN_NEW_CHARS
+)
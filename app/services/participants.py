@@ -0,0 +1,147 @@
+import uuid
+import logging
+from datetime import datetime
+from typing import List
+from sqlalchemy import insert, literal, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.config import settings
+from app.db import async_session
+from app.models.meeting import Meeting
+from app.models.participant import MeetingParticipant
+
+logger = logging.getLogger(__name__)
+
+# Outcomes of admit()
+JOINED = "joined"
+ALREADY_JOINED = "already_joined"
+FULL = "full"
+ENDED = "ended"
+NOT_FOUND = "not_found"
+
+def _take_seat(meeting_id: str):
+    """Claim a seat by bumping the meeting's counter, only while it is active and below the cap.
+
+    The conditional UPDATE locks the meeting row and re-checks the cap against
+    the latest count, so concurrent joins cannot overshoot it.
+    """
+    return (
+        update(Meeting)
+        .where(
+            Meeting.id == meeting_id,
+            Meeting.status == "active",
+            Meeting.participant_count < settings.MAX_PARTICIPANTS
+        )
+        .values(participant_count=Meeting.participant_count + 1)
+        .returning(Meeting.id)
+    )
+
+async def _insert_seated(s: AsyncSession, meeting_id: str, user_name: str, now: datetime) -> bool:
+    """Take a seat and insert the participant row. True if admitted.
+
+    On PostgreSQL both happen in one statement (the UPDATE runs as a CTE);
+    other databases run the two statements in the same transaction.
+    """
+    existing = (
+        select(MeetingParticipant.id)
+        .where(MeetingParticipant.meeting_id == meeting_id, MeetingParticipant.user_name == user_name)
+    )
+    seat = _take_seat(meeting_id).where(~existing.exists())
+    if s.bind.dialect.name == "postgresql":
+        seated = seat.cte("seated")
+        result = await s.exec(
+            insert(MeetingParticipant).from_select(
+                ["id", "meeting_id", "user_name", "joined_at"],
+                select(literal(str(uuid.uuid4())), seated.c.id, literal(user_name), literal(now))
+            )
+        )
+        return result.rowcount == 1
+    if (await s.exec(seat)).first() is None:
+        return False
+    s.add(MeetingParticipant(id=str(uuid.uuid4()), meeting_id=meeting_id, user_name=user_name, joined_at=now))
+    await s.flush()
+    return True
+
+async def admit(meeting_id: str, user_name: str) -> str:
+    """Admit a user to a meeting against settings.MAX_PARTICIPANTS. Returns one of the outcomes above.
+
+    A first-time joiner is admitted in a single round trip; the slower checks
+    only run when that statement admitted nobody.
+    """
+    now = datetime.utcnow()
+    async with async_session() as s:
+        try:
+            if await _insert_seated(s, meeting_id, user_name, now):
+                await s.commit()
+                return JOINED
+        except IntegrityError:
+            # The same user joined concurrently; the failed statement released the seat
+            await s.rollback()
+            return ALREADY_JOINED
+        await s.rollback()
+
+        meeting = await s.get(Meeting, meeting_id)
+        if not meeting:
+            return NOT_FOUND
+        if meeting.status != "active":
+            return ENDED
+        participant = (await s.exec(
+            select(MeetingParticipant)
+            .where(MeetingParticipant.meeting_id == meeting_id, MeetingParticipant.user_name == user_name)
+        )).first()
+        if participant and participant.left_at is None:
+            return ALREADY_JOINED
+        if participant is None:
+            # The seats were all taken when the first statement ran
+            return FULL
+
+        # Rejoin after leaving: take a seat again and reopen the row
+        if (await s.exec(_take_seat(meeting_id))).first() is None:
+            await s.rollback()
+            return FULL
+        reopened = await s.exec(
+            update(MeetingParticipant)
+            .where(MeetingParticipant.id == participant.id, MeetingParticipant.left_at.is_not(None))
+            .values(left_at=None, joined_at=now)
+        )
+        if reopened.rowcount != 1:
+            # Another request for the same user reopened it first
+            await s.rollback()
+            return ALREADY_JOINED
+        await s.commit()
+        return JOINED
+
+async def leave(meeting_id: str, user_name: str) -> bool:
+    """Mark a participant as gone and free their seat. False if they were not in the meeting."""
+    async with async_session() as s:
+        left = await s.exec(
+            update(MeetingParticipant)
+            .where(
+                MeetingParticipant.meeting_id == meeting_id,
+                MeetingParticipant.user_name == user_name,
+                MeetingParticipant.left_at.is_(None)
+            )
+            .values(left_at=datetime.utcnow())
+        )
+        if left.rowcount != 1:
+            return False
+        await s.exec(
+            update(Meeting)
+            .where(Meeting.id == meeting_id)
+            .values(participant_count=Meeting.participant_count - 1)
+        )
+        await s.commit()
+    return True
+
+async def get_participants(meeting_id: str, s: AsyncSession = None) -> List[str]:
+    """Names of the users currently in a meeting, in join order"""
+    query = (
+        select(MeetingParticipant.user_name)
+        .where(MeetingParticipant.meeting_id == meeting_id, MeetingParticipant.left_at.is_(None))
+        .order_by(MeetingParticipant.joined_at, MeetingParticipant.id)
+    )
+    if s is not None:
+        return list((await s.exec(query)).all())
+    async with async_session() as s:
+        return list((await s.exec(query)).all())
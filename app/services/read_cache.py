@@ -0,0 +1,223 @@
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from time import monotonic
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func
+from sqlmodel import select
+from app.config import settings
+from app.db import async_session
+from app.models.insight import Insight
+from app.models.meeting import Meeting
+from app.models.transcription import Transcription
+
+logger = logging.getLogger(__name__)
+
+class CacheTier(ABC):
+    """Storage for JSON-safe dict values with a time to live."""
+    name = "base"
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[dict]:
+        """The stored value, or None if missing or expired."""
+
+    @abstractmethod
+    async def set(self, key: str, value: dict, ttl: float):
+        """Store a value for ttl seconds."""
+
+    @abstractmethod
+    async def delete(self, *keys: str):
+        """Drop keys; missing keys are ignored."""
+
+    async def close(self):
+        pass
+
+class MemoryTier(CacheTier):
+    """Per-process LRU."""
+    name = "memory"
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[dict]:
+        entry = self.entries.get(key)
+        if not entry:
+            return None
+        expires_at, value = entry
+        if monotonic() >= expires_at:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: dict, ttl: float):
+        self.entries[key] = (monotonic() + ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self.entries.pop(key, None)
+
+class RedisTier(CacheTier):
+    """Redis tier shared by web and worker processes (needs the redis package)."""
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "webrtc:view:"):
+        import redis.asyncio as redis
+        self.client = redis.from_url(url)
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[dict]:
+        raw = await self.client.get(self.prefix + key)
+        return json.loads(raw) if raw else None
+
+    async def set(self, key: str, value: dict, ttl: float):
+        await self.client.set(self.prefix + key, json.dumps(value), px=int(ttl * 1000))
+
+    async def delete(self, *keys: str):
+        await self.client.delete(*(self.prefix + key for key in keys))
+
+    async def close(self):
+        await self.client.aclose()
+
+class ReadCache:
+    """Read-through cache for views that clients poll.
+
+    Lookups try the in-process tier, then the shared tier if one is configured,
+    then load from the database once per key however many requests are waiting.
+    Writers call invalidate() after committing; entries also expire after their
+    TTL, which bounds staleness in processes that did not see the invalidation.
+    With a shared tier the in-process TTL is kept short for the same reason.
+    """
+    def __init__(self, local: CacheTier, shared: Optional[CacheTier], ttl: float, local_ttl: float):
+        self.local = local
+        self.shared = shared
+        self.ttl = ttl
+        self.local_ttl = min(ttl, local_ttl) if shared else ttl
+        self.loading: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[dict]]) -> dict:
+        value = await self.local.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        if self.shared:
+            try:
+                value = await self.shared.get(key)
+            except Exception as e:
+                logger.warning(f"[READ CACHE] Shared tier get failed for {key}: {e}")
+            if value is not None:
+                await self.local.set(key, value, self.local_ttl)
+                self.hits += 1
+                return value
+
+        # Concurrent misses for a key share one load, which outlives a cancelled request
+        task = self.loading.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.create_task(self._load(key, loader))
+            self.loading[key] = task
+        return await asyncio.shield(task)
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[dict]]) -> dict:
+        try:
+            value = jsonable_encoder(await loader())
+        finally:
+            # invalidate() drops the load, so a value read before a write is served but not stored
+            current = self.loading.get(key) is asyncio.current_task()
+            if current:
+                del self.loading[key]
+        if current:
+            await self.local.set(key, value, self.local_ttl)
+            if self.shared:
+                try:
+                    await self.shared.set(key, value, self.ttl)
+                except Exception as e:
+                    logger.warning(f"[READ CACHE] Shared tier set failed for {key}: {e}")
+        return value
+
+    async def invalidate(self, *keys: str):
+        for key in keys:
+            self.loading.pop(key, None)
+        await self.local.delete(*keys)
+        if self.shared:
+            try:
+                await self.shared.delete(*keys)
+            except Exception as e:
+                logger.warning(f"[READ CACHE] Shared tier delete failed for {keys}: {e}")
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses,
+                "shared_tier": self.shared.name if self.shared else None}
+
+    async def close(self):
+        if self.shared:
+            await self.shared.close()
+
+def meeting_key(meeting_id: str) -> str:
+    return f"meeting:{meeting_id}"
+
+def summary_key(meeting_id: str) -> str:
+    return f"summary:{meeting_id}"
+
+async def get_meeting_view(meeting_id: str) -> Optional[dict]:
+    """Meeting metadata as a JSON-safe dict, or None if the meeting does not exist."""
+    async def load():
+        from app.services.participants import get_participants
+        async with async_session() as s:
+            meeting = await s.get(Meeting, meeting_id)
+            if not meeting:
+                return {"meeting": None}
+            return {"meeting": {**meeting.model_dump(), "participants": await get_participants(meeting_id, s)}}
+    return (await read_cache.get_or_load(meeting_key(meeting_id), load))["meeting"]
+
+async def get_summary_view(meeting_id: str) -> dict:
+    """Insight availability for a meeting.
+
+    Returns {"insight", "has_transcript", "job_status"}; the last two are only
+    looked up while the meeting has no insight.
+    """
+    async def load():
+        from app.services.insight_generator import get_insights_job
+        async with async_session() as s:
+            insight = (await s.exec(select(Insight).where(Insight.meeting_id == meeting_id))).first()
+            if insight:
+                return {"insight": insight.model_dump(), "has_transcript": True, "job_status": "completed"}
+            has_transcript = (await s.exec(
+                select(Transcription.id)
+                .where(Transcription.meeting_id == meeting_id, func.trim(Transcription.content) != "")
+                .limit(1)
+            )).first() is not None
+        job = await get_insights_job(meeting_id)
+        return {"insight": None, "has_transcript": has_transcript, "job_status": job.status if job else None}
+    return await read_cache.get_or_load(summary_key(meeting_id), load)
+
+async def invalidate_meeting(meeting_id: str):
+    await read_cache.invalidate(meeting_key(meeting_id), summary_key(meeting_id))
+
+async def invalidate_summary(*meeting_ids: str):
+    await read_cache.invalidate(*(summary_key(meeting_id) for meeting_id in meeting_ids))
+
+def build_read_cache() -> ReadCache:
+    shared = None
+    if settings.READ_CACHE_BACKEND == "redis":
+        shared = RedisTier(settings.READ_CACHE_REDIS_URL)
+    elif settings.READ_CACHE_BACKEND != "memory":
+        raise ValueError(f"Unknown READ_CACHE_BACKEND: {settings.READ_CACHE_BACKEND}")
+    return ReadCache(
+        MemoryTier(settings.READ_CACHE_MEMORY_SIZE),
+        shared,
+        settings.READ_CACHE_TTL_SECONDS,
+        settings.READ_CACHE_LOCAL_TTL_SECONDS
+    )
+
+# Global instance
+read_cache = build_read_cache()
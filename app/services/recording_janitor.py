@@ -0,0 +1,248 @@
+import asyncio
+import os
+import time
+import logging
+import subprocess
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlmodel import select
+from app.config import settings
+from app.db import async_session
+from app.models.meeting import Meeting
+from app.models.pipeline_job import PipelineJob
+from app.services.job_queue import job_queue, PRIORITY_BACKFILL
+from app.services.transcode_executor import transcode_executor
+
+logger = logging.getLogger(__name__)
+
+# Source recordings; every other audio file in the directory is a derived intermediate
+SOURCE_SUFFIX = "_all.webm"
+LOOKUP_CHUNK = 500
+
+class RecordingFile:
+    def __init__(self, path: str, meeting_id: str, size: int, mtime: float):
+        self.path = path
+        self.meeting_id = meeting_id
+        self.size = size
+        self.mtime = mtime
+
+class RecordingJanitor:
+    """Reclaims disk space in RECORDINGS_DIR.
+
+    A sweep leaves alone files of active meetings, meetings with a transcription
+    job queued or running, and anything modified within the grace period.
+    Of the rest:
+    - derived .wav files are deleted, they are regenerated from the source,
+      and so are uploads left behind by failed transcription jobs;
+    - source recordings of known meetings within retention are re-encoded to
+      Opus in the archive directory (several per ffmpeg run) and then deleted;
+    - source recordings of unknown meetings or past retention are deleted.
+    Archived files past retention are deleted, and then the oldest archives
+    until recordings fit in the disk quota.
+    """
+    def __init__(self, recordings_dir: str, archive_dir: str, grace: float, retention_days: int,
+                 quota_bytes: int, archive_enabled: bool, bitrate: str, batch_size: int):
+        self.recordings_dir = recordings_dir
+        self.archive_dir = archive_dir
+        self.grace = grace
+        self.retention = timedelta(days=retention_days)
+        self.quota_bytes = quota_bytes
+        self.archive_enabled = archive_enabled
+        self.bitrate = bitrate
+        self.batch_size = batch_size
+        self.last_report: Optional[dict] = None
+
+    async def schedule(self, interval: float):
+        """Queue a sweep every interval; workers sharing the queue run only one at a time."""
+        while True:
+            try:
+                await job_queue.enqueue("janitor", None, {"dry_run": False}, PRIORITY_BACKFILL,
+                                        dedupe_key="janitor:recordings", reuse=("queued", "running"))
+            except Exception as e:
+                logger.error(f"[JANITOR] Could not queue a sweep: {e}")
+            await asyncio.sleep(interval)
+
+    async def sweep(self, dry_run: bool = False) -> dict:
+        """Apply retention, archival and quota once. Returns what was (or would be) reclaimed."""
+        started = time.monotonic()
+        report = {"dry_run": dry_run, "scanned": 0, "deleted": 0, "archived": 0, "kept": 0,
+                  "failed": 0, "reclaimed_bytes": 0, "archive_bytes": 0}
+        now = time.time()
+        files = await asyncio.to_thread(self._scan, self.recordings_dir, os.path.basename(self.archive_dir))
+        report["scanned"] = len(files)
+        candidates = [f for f in files if now - f.mtime >= self.grace]
+        meetings, busy = await self._lookup({f.meeting_id for f in candidates})
+
+        to_delete: List[RecordingFile] = []
+        to_archive: List[RecordingFile] = []
+        cutoff = datetime.utcnow() - self.retention
+        for f in candidates:
+            meeting = meetings.get(f.meeting_id)
+            if f.meeting_id in busy or (meeting and meeting.status == "active"):
+                report["kept"] += 1
+            elif not f.path.endswith(SOURCE_SUFFIX):
+                to_delete.append(f)
+            elif meeting and self.archive_enabled and (meeting.ended_at or meeting.created_at) >= cutoff:
+                to_archive.append(f)
+            else:
+                to_delete.append(f)
+        report["kept"] += len(files) - len(candidates)
+
+        if dry_run:
+            # Archive sizes are unknown until encoded, so only deletions count as reclaimed
+            report["deleted"] = len(to_delete)
+            report["archived"] = len(to_archive)
+            report["reclaimed_bytes"] = sum(f.size for f in to_delete)
+            report["archive_source_bytes"] = sum(f.size for f in to_archive)
+        else:
+            for f in to_delete:
+                self._delete(f, report)
+            for i in range(0, len(to_archive), self.batch_size):
+                await self._archive(to_archive[i:i + self.batch_size], report)
+        await asyncio.to_thread(self._trim_archive, dry_run, report)
+
+        report["seconds"] = round(time.monotonic() - started, 2)
+        logger.info(
+            f"[JANITOR] {'Dry run: ' if dry_run else ''}scanned {report['scanned']}, deleted {report['deleted']}, "
+            f"archived {report['archived']}, failed {report['failed']}, reclaimed {report['reclaimed_bytes']} bytes"
+        )
+        if not dry_run:
+            self.last_report = report
+        return report
+
+    @staticmethod
+    def _scan(directory: str, skip: str) -> List[RecordingFile]:
+        files = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name == skip or not entry.is_file() or not entry.name.endswith((".webm", ".wav")):
+                    continue
+                stat = entry.stat()
+                meeting_id = entry.name.split("_", 1)[0].rsplit(".", 1)[0]
+                files.append(RecordingFile(entry.path, meeting_id, stat.st_size, stat.st_mtime))
+        return files
+
+    async def _lookup(self, meeting_ids: set) -> Tuple[Dict[str, Meeting], set]:
+        """Meetings by id, and the ids with a transcription job still queued or running"""
+        meetings: Dict[str, Meeting] = {}
+        busy = set()
+        ids = list(meeting_ids)
+        async with async_session() as s:
+            for i in range(0, len(ids), LOOKUP_CHUNK):
+                chunk = ids[i:i + LOOKUP_CHUNK]
+                for meeting in (await s.exec(select(Meeting).where(Meeting.id.in_(chunk)))).all():
+                    meetings[meeting.id] = meeting
+                busy.update((await s.exec(
+                    select(PipelineJob.meeting_id).where(
+                        PipelineJob.meeting_id.in_(chunk),
+                        PipelineJob.kind == "transcribe",
+                        PipelineJob.status.in_(("queued", "running"))
+                    )
+                )).all())
+        return meetings, busy
+
+    def _delete(self, f: RecordingFile, report: dict):
+        try:
+            os.remove(f.path)
+            report["deleted"] += 1
+            report["reclaimed_bytes"] += f.size
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            report["failed"] += 1
+            logger.error(f"[JANITOR] Could not delete {f.path}: {e}")
+
+    def _archive_path(self, f: RecordingFile) -> str:
+        return os.path.join(self.archive_dir, f"{f.meeting_id}.opus")
+
+    async def _archive(self, batch: List[RecordingFile], report: dict):
+        """Re-encode a batch of recordings to Opus in one ffmpeg run, then delete the sources."""
+        os.makedirs(self.archive_dir, exist_ok=True)
+        cmd = ['ffmpeg', '-y', '-loglevel', 'error']
+        for f in batch:
+            cmd += ['-i', f.path]
+        for index, f in enumerate(batch):
+            cmd += [
+                '-map', f"{index}:a", '-c:a', 'libopus', '-b:a', self.bitrate, '-ac', '1',
+                '-application', 'voip', self._archive_path(f)
+            ]
+        try:
+            await transcode_executor.submit("janitor", self._archive_path(batch[0]), cmd)
+        except subprocess.CalledProcessError as e:
+            if len(batch) > 1:
+                # One unreadable input fails the whole run; retry one by one to isolate it
+                for f in batch:
+                    await self._archive([f], report)
+                return
+            report["failed"] += 1
+            logger.error(f"[JANITOR] Could not archive {batch[0].path}: {e.stderr}")
+            return
+        except Exception as e:
+            # ffmpeg missing or not startable: retrying file by file would fail the same way
+            report["failed"] += len(batch)
+            logger.error(f"[JANITOR] Could not archive {len(batch)} recordings: {e}")
+            return
+        for f in batch:
+            archived = self._archive_path(f)
+            if not os.path.exists(archived) or os.path.getsize(archived) == 0:
+                report["failed"] += 1
+                continue
+            try:
+                os.remove(f.path)
+            except OSError as e:
+                report["failed"] += 1
+                logger.error(f"[JANITOR] Could not delete archived source {f.path}: {e}")
+                continue
+            report["archived"] += 1
+            # Net of the Opus file written in its place
+            report["reclaimed_bytes"] += f.size - os.path.getsize(archived)
+
+    def _trim_archive(self, dry_run: bool, report: dict):
+        """Delete archives past retention, then the oldest ones until under the quota."""
+        if not os.path.isdir(self.archive_dir):
+            return
+        archives = []
+        with os.scandir(self.archive_dir) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    stat = entry.stat()
+                    archives.append((stat.st_mtime, stat.st_size, entry.path))
+        archives.sort()
+        cutoff = time.time() - self.retention.total_seconds()
+        with os.scandir(self.recordings_dir) as entries:
+            total = sum(entry.stat().st_size for entry in entries if entry.is_file())
+        total += sum(size for _, size, _ in archives)
+        if dry_run:
+            total -= report["reclaimed_bytes"]
+        remaining = []
+        for mtime, size, path in archives:
+            if mtime < cutoff or total > self.quota_bytes:
+                if dry_run or self._remove_archive(path, report):
+                    total -= size
+                    report["deleted"] += 1
+                    report["reclaimed_bytes"] += size
+                    continue
+            remaining.append(size)
+        report["archive_bytes"] = sum(remaining)
+
+    @staticmethod
+    def _remove_archive(path: str, report: dict) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError as e:
+            report["failed"] += 1
+            logger.error(f"[JANITOR] Could not delete {path}: {e}")
+            return False
+
+# Global instance
+recording_janitor = RecordingJanitor(
+    settings.RECORDINGS_DIR,
+    settings.RECORDING_ARCHIVE_DIR,
+    settings.RECORDING_GRACE_SECONDS,
+    settings.RECORDING_RETENTION_DAYS,
+    settings.RECORDING_DISK_QUOTA_BYTES,
+    settings.RECORDING_ARCHIVE_ENABLED,
+    settings.RECORDING_ARCHIVE_BITRATE,
+    settings.RECORDING_ARCHIVE_BATCH
+)
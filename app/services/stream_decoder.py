@@ -0,0 +1,140 @@
+import asyncio
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2  # pcm_s16le
+CHANNELS = 1
+
+class PcmRingBuffer:
+    """Fixed-size buffer of the most recent decoded PCM, addressed by absolute byte position."""
+    def __init__(self, capacity_bytes: int):
+        self.capacity = capacity_bytes - capacity_bytes % SAMPLE_WIDTH
+        self.buffer = bytearray(self.capacity)
+        self.total_written = 0
+
+    @property
+    def oldest_position(self) -> int:
+        return max(0, self.total_written - self.capacity)
+
+    def write(self, data: bytes):
+        if len(data) >= self.capacity:
+            # Only the tail fits
+            skipped = len(data) - self.capacity
+            self.total_written += skipped
+            data = data[skipped:]
+        pos = self.total_written % self.capacity
+        first = min(len(data), self.capacity - pos)
+        self.buffer[pos:pos + first] = data[:first]
+        self.buffer[0:len(data) - first] = data[first:]
+        self.total_written += len(data)
+
+    def read(self, start: int, end: Optional[int] = None) -> bytes:
+        """Return PCM between absolute positions; data older than the buffer is dropped."""
+        end = self.total_written if end is None else min(end, self.total_written)
+        start = max(start, self.oldest_position)
+        if start >= end:
+            return b""
+        a = start % self.capacity
+        b = end % self.capacity
+        if a < b:
+            return bytes(self.buffer[a:b])
+        return bytes(self.buffer[a:]) + bytes(self.buffer[:b])
+
+class StreamDecoder:
+    """Long-lived ffmpeg process turning a live WebM stream into 16 kHz mono PCM.
+
+    Chunks are written to ffmpeg's stdin as they arrive and decoded PCM is read
+    from stdout into a ring buffer, so the container is parsed once per meeting
+    instead of once per transcription window.
+    """
+    def __init__(self, meeting_id: str, buffer_seconds: float):
+        self.meeting_id = meeting_id
+        self.ring = PcmRingBuffer(int(buffer_seconds * SAMPLE_RATE * SAMPLE_WIDTH * CHANNELS))
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._stderr_reader: Optional[asyncio.Task] = None
+        self._last_error = ""
+
+    async def start(self):
+        cmd = [
+            'ffmpeg', '-loglevel', 'error', '-f', 'webm', '-i', 'pipe:0',
+            '-f', 's16le', '-acodec', 'pcm_s16le', '-ar', str(SAMPLE_RATE), '-ac', str(CHANNELS), 'pipe:1'
+        ]
+        self.process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        self._reader = asyncio.create_task(self._read_pcm())
+        self._stderr_reader = asyncio.create_task(self._read_stderr())
+        logger.info(f"[DECODER] Started ffmpeg stream decoder for meeting {self.meeting_id} (pid {self.process.pid})")
+
+    @property
+    def running(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    @property
+    def decoded_seconds(self) -> float:
+        return self.ring.total_written / float(SAMPLE_RATE * SAMPLE_WIDTH * CHANNELS)
+
+    @property
+    def buffered_from(self) -> float:
+        """Offset in seconds of the oldest PCM still held in the ring buffer."""
+        return self.ring.oldest_position / float(SAMPLE_RATE * SAMPLE_WIDTH * CHANNELS)
+
+    def read_seconds(self, start: float, end: Optional[float] = None) -> bytes:
+        """Return decoded PCM between two offsets in seconds."""
+        bytes_per_second = SAMPLE_RATE * SAMPLE_WIDTH * CHANNELS
+        start_pos = int(start * SAMPLE_RATE) * SAMPLE_WIDTH * CHANNELS
+        end_pos = None if end is None else int(end * SAMPLE_RATE) * SAMPLE_WIDTH * CHANNELS
+        data = self.ring.read(start_pos, end_pos)
+        if start_pos < self.ring.oldest_position:
+            logger.warning(
+                f"[DECODER] Window for meeting {self.meeting_id} starts "
+                f"{(self.ring.oldest_position - start_pos) / bytes_per_second:.2f}s before the buffered audio"
+            )
+        return data
+
+    async def feed(self, data: bytes):
+        if not self.running:
+            return
+        try:
+            self.process.stdin.write(data)
+            await self.process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError) as e:
+            logger.error(f"[DECODER] ffmpeg stdin closed for meeting {self.meeting_id}: {e} {self._last_error}")
+
+    async def close(self, timeout: float = 10.0):
+        """Close stdin, let ffmpeg flush the remaining PCM and wait for it to exit."""
+        if self.process is None:
+            return
+        try:
+            if self.process.stdin and not self.process.stdin.is_closing():
+                self.process.stdin.close()
+            await asyncio.wait_for(self.process.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"[DECODER] ffmpeg did not exit for meeting {self.meeting_id}, killing it")
+            self.process.kill()
+            await self.process.wait()
+        tasks = [t for t in (self._reader, self._stderr_reader) if t]
+        await asyncio.gather(*tasks, return_exceptions=True)
+        logger.info(f"[DECODER] Stopped stream decoder for meeting {self.meeting_id} ({self.decoded_seconds:.2f}s decoded)")
+
+    async def _read_pcm(self):
+        while True:
+            data = await self.process.stdout.read(64 * 1024)
+            if not data:
+                break
+            self.ring.write(data)
+
+    async def _read_stderr(self):
+        while True:
+            line = await self.process.stderr.readline()
+            if not line:
+                break
+            self._last_error = line.decode(errors="replace").strip()
+            logger.debug(f"[DECODER] ffmpeg ({self.meeting_id}): {self._last_error}")
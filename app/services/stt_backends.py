@@ -0,0 +1,168 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+import logging
+from typing import Optional
+import aiofiles
+import httpx
+from app.config import settings
+from app.utils.audio_metadata import probe_audio
+
+logger = logging.getLogger(__name__)
+
+class RateLimiter:
+    """Caps in-flight calls with a semaphore and call rate with a token bucket."""
+    def __init__(self, max_concurrency: int, rate_per_second: float, burst: int):
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.rate = rate_per_second
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def _take_token(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        try:
+            await self._take_token()
+        except BaseException:
+            self.semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.semaphore.release()
+
+class TranscriptionBackend(ABC):
+    """Speech-to-text provider. Results are {"text", "words", "utterances"}, times in seconds."""
+    name = "base"
+
+    def __init__(self, limiter: RateLimiter):
+        self.limiter = limiter
+
+    async def transcribe(self, audio_path: str, mimetype: str = "audio/wav",
+                         language: Optional[str] = None) -> dict:
+        async with self.limiter:
+            return await self._transcribe(audio_path, mimetype, language or "en")
+
+    @abstractmethod
+    async def _transcribe(self, audio_path: str, mimetype: str, language: str) -> dict:
+        """Send one file to the provider, without rate limiting."""
+
+    async def close(self):
+        pass
+
+class DeepgramBackend(TranscriptionBackend):
+    """Deepgram prerecorded API over one pooled HTTP client."""
+    name = "deepgram"
+
+    def __init__(self, limiter: RateLimiter, api_key: str, base_url: str, timeout: float):
+        super().__init__(limiter)
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            headers={"Authorization": f"Token {api_key}"},
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=settings.STT_MAX_CONCURRENCY,
+                                max_keepalive_connections=settings.STT_MAX_CONCURRENCY),
+        )
+
+    async def _transcribe(self, audio_path: str, mimetype: str, language: str) -> dict:
+        async def body():
+            async with aiofiles.open(audio_path, "rb") as f:
+                while True:
+                    chunk = await f.read(256 * 1024)
+                    if not chunk:
+                        break
+                    yield chunk
+
+        response = await self.client.post(
+            "/v1/listen",
+            params={"punctuate": "true", "diarize": str(settings.STT_DIARIZE).lower(), "language": language},
+            headers={"Content-Type": mimetype},
+            content=body(),
+        )
+        response.raise_for_status()
+        return self.parse(response.json())
+
+    def parse(self, response: dict) -> dict:
+        if not response or "results" not in response or not response["results"].get("channels"):
+            logger.error(f"Deepgram returned no results: {response}")
+            return {"text": "", "words": [], "utterances": []}
+        try:
+            alternative = response["results"]["channels"][0]["alternatives"][0]
+            return {
+                "text": alternative.get("transcript", ""),
+                "words": alternative.get("words", []),
+                "utterances": response["results"].get("utterances", []),
+            }
+        except Exception as e:
+            logger.error(f"Error parsing Deepgram response: {e}, response: {response}")
+            return {"text": "", "words": [], "utterances": []}
+
+    async def close(self):
+        await self.client.aclose()
+
+class LocalBackend(TranscriptionBackend):
+    """Deterministic stand-in for tests and offline benchmarks.
+
+    Returns the configured transcript after a fixed delay, with its words spread
+    evenly over the audio's duration so downstream timing logic still works.
+    """
+    name = "local"
+
+    def __init__(self, limiter: RateLimiter, transcript: str, latency: float):
+        super().__init__(limiter)
+        self.transcript = transcript
+        self.latency = latency
+
+    async def _transcribe(self, audio_path: str, mimetype: str, language: str) -> dict:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        tokens = self.transcript.split()
+        duration = probe_audio(audio_path).duration or float(len(tokens))
+        step = duration / max(1, len(tokens))
+        words = [
+            {"word": t.strip(".,?!").lower(), "punctuated_word": t,
+             "start": i * step, "end": (i + 1) * step, "confidence": 1.0}
+            for i, t in enumerate(tokens)
+        ]
+        return {"text": self.transcript, "words": words, "utterances": []}
+
+_backend: Optional[TranscriptionBackend] = None
+
+def get_stt_backend() -> TranscriptionBackend:
+    """Return the backend chosen by settings.STT_BACKEND, created on first use."""
+    global _backend
+    if _backend is None:
+        limiter = RateLimiter(
+            settings.STT_MAX_CONCURRENCY,
+            settings.STT_REQUESTS_PER_SECOND,
+            settings.STT_BURST
+        )
+        if settings.STT_BACKEND == "local":
+            _backend = LocalBackend(limiter, settings.STT_LOCAL_TRANSCRIPT, settings.STT_LOCAL_LATENCY_SECONDS)
+        elif settings.STT_BACKEND == "deepgram":
+            _backend = DeepgramBackend(limiter, settings.DEEPGRAM_API_KEY,
+                                       settings.DEEPGRAM_BASE_URL, settings.STT_TIMEOUT_SECONDS)
+        else:
+            raise ValueError(f"Unknown STT_BACKEND: {settings.STT_BACKEND}")
+        logger.info(f"[STT] Using {_backend.name} transcription backend")
+    return _backend
+
+async def close_stt_backend():
+    global _backend
+    if _backend is not None:
+        await _backend.close()
+        _backend = None
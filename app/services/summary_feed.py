@@ -0,0 +1,83 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+from fastapi import WebSocket
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from app.config import settings
+from app.db import async_session
+from app.models.summary_update import SummaryUpdate
+
+logger = logging.getLogger(__name__)
+
+class SummaryFeed:
+    """Relays summary updates to /ws/summary clients through the database.
+
+    Insights are generated by pipeline workers that may run in another
+    process, so each update overwrites the meeting's SummaryUpdate row and
+    every web process polls the rows of the meetings its clients watch.
+    Updates between two polls are coalesced; each one carries full sections.
+    """
+    def __init__(self, poll_seconds: float):
+        self.poll_seconds = poll_seconds
+        # meeting_id -> {websocket: last seq sent}
+        self.subscribers: Dict[str, Dict[WebSocket, int]] = {}
+        self.task: Optional[asyncio.Task] = None
+
+    def subscribe(self, meeting_id: str, ws: WebSocket):
+        self.subscribers.setdefault(meeting_id, {})[ws] = -1
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._poll())
+
+    def unsubscribe(self, meeting_id: str, ws: WebSocket):
+        sockets = self.subscribers.get(meeting_id)
+        if sockets is not None:
+            sockets.pop(ws, None)
+            if not sockets:
+                del self.subscribers[meeting_id]
+
+    async def publish(self, meeting_id: str, data: dict):
+        payload = {"type": "summary", **data}
+        async with async_session() as s:
+            values = {"payload": payload, "seq": SummaryUpdate.seq + 1, "updated_at": datetime.utcnow()}
+            result = await s.exec(
+                update(SummaryUpdate).where(SummaryUpdate.meeting_id == meeting_id).values(**values)
+            )
+            if not result.rowcount:
+                s.add(SummaryUpdate(meeting_id=meeting_id, payload=payload, seq=1))
+            try:
+                await s.commit()
+            except IntegrityError:
+                # Another process created the row first
+                await s.rollback()
+                await s.exec(
+                    update(SummaryUpdate).where(SummaryUpdate.meeting_id == meeting_id).values(**values)
+                )
+                await s.commit()
+
+    async def _read(self, meeting_ids: list) -> list:
+        async with async_session() as s:
+            return (await s.exec(select(SummaryUpdate).where(SummaryUpdate.meeting_id.in_(meeting_ids)))).all()
+
+    async def _poll(self):
+        while self.subscribers:
+            try:
+                rows = await self._read(list(self.subscribers))
+            except Exception as e:
+                logger.error(f"[SUMMARY FEED] Poll failed: {e}")
+                rows = []
+            for row in rows:
+                for ws, seen in list(self.subscribers.get(row.meeting_id, {}).items()):
+                    if row.seq <= seen:
+                        continue
+                    try:
+                        await ws.send_json(row.payload)
+                        self.subscribers[row.meeting_id][ws] = row.seq
+                    except Exception:
+                        self.unsubscribe(row.meeting_id, ws)
+            await asyncio.sleep(self.poll_seconds)
+
+# Global instance
+summary_feed = SummaryFeed(settings.SUMMARY_FEED_POLL_SECONDS)
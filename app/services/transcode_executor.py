@@ -0,0 +1,144 @@
+import asyncio
+import time
+import logging
+import subprocess
+from typing import Dict, List, Optional, Tuple
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+class TranscodeShutdownError(RuntimeError):
+    """The executor shut down before the job finished."""
+
+class TranscodeJob:
+    def __init__(self, key: Tuple[str, str, tuple], cmd: List[str], future: asyncio.Future):
+        self.key = key
+        self.cmd = cmd
+        self.future = future
+        self.waiters = 1
+        self.enqueued_at = time.monotonic()
+
+class TranscodeExecutor:
+    """Runs ffmpeg jobs on a fixed number of workers fed by a bounded queue.
+
+    ffmpeg runs as an asyncio subprocess, so the event loop keeps serving
+    requests while audio is transcoded. A job that is still queued with the same
+    meeting, output file and command is shared instead of being run twice.
+    """
+    def __init__(self, workers: int, queue_size: int):
+        self.worker_count = workers
+        self.queue_size = queue_size
+        self.queue: Optional[asyncio.Queue] = None
+        self.workers: List[asyncio.Task] = []
+        self.pending: Dict[Tuple[str, str, tuple], TranscodeJob] = {}
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+
+    def _ensure_workers(self):
+        if self.queue is None:
+            self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.workers = [w for w in self.workers if not w.done()]
+        while len(self.workers) < self.worker_count:
+            self.workers.append(asyncio.create_task(self._worker(len(self.workers))))
+
+    async def submit(self, meeting_id: str, output_path: str, cmd: List[str]) -> str:
+        """Queue an ffmpeg command and wait for it. Returns the output path."""
+        self._ensure_workers()
+        # Only an identical command is shared; another offset or duration for the same output runs on its own
+        key = (meeting_id, output_path, tuple(cmd))
+        job = self.pending.get(key)
+        if job is None:
+            job = TranscodeJob(key, cmd, asyncio.get_running_loop().create_future())
+            self.pending[key] = job
+            try:
+                # Waits here when the queue is full, pushing back on the caller
+                await self.queue.put(job)
+            except asyncio.CancelledError:
+                # The job never reached the queue; callers that joined it must not wait forever
+                if self.pending.get(key) is job:
+                    del self.pending[key]
+                if job.waiters > 1:
+                    job.future.set_exception(TranscodeShutdownError("Transcode was cancelled before it was queued"))
+                else:
+                    job.future.cancel()
+                raise
+        else:
+            job.waiters += 1
+            logger.info(f"[TRANSCODE] Reusing queued job for meeting {meeting_id}: {output_path}")
+        return await asyncio.shield(job.future)
+
+    async def _worker(self, index: int):
+        while True:
+            job = await self.queue.get()
+            if self.pending.get(job.key) is job:
+                del self.pending[job.key]
+            wait = time.monotonic() - job.enqueued_at
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.running += 1
+            started = time.monotonic()
+            process = None
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *job.cmd,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+                stdout, stderr = await process.communicate()
+                if process.returncode != 0:
+                    raise subprocess.CalledProcessError(process.returncode, job.cmd, stdout, stderr)
+                self.completed += 1
+                if not job.future.done():
+                    job.future.set_result(job.key[1])
+            except asyncio.CancelledError:
+                # shutdown(): stop ffmpeg and release whoever waits for this job
+                if process and process.returncode is None:
+                    process.kill()
+                self.failed += 1
+                if not job.future.done():
+                    job.future.set_exception(TranscodeShutdownError("Transcode executor shut down"))
+                raise
+            except Exception as e:
+                self.failed += 1
+                if not job.future.done():
+                    job.future.set_exception(e)
+            finally:
+                self.running -= 1
+                self.total_run += time.monotonic() - started
+                self.queue.task_done()
+                logger.debug(f"[TRANSCODE] Worker {index} finished {job.key[:2]} (waited {wait:.2f}s)")
+
+    def stats(self) -> dict:
+        """Queue depth and timings, for sizing TRANSCODE_WORKERS / TRANSCODE_QUEUE_SIZE."""
+        finished = self.completed + self.failed
+        return {
+            "workers": self.worker_count,
+            "queue_size": self.queue_size,
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_wait_seconds": round(self.total_wait / finished, 3) if finished else 0.0,
+            "max_wait_seconds": round(self.max_wait, 3),
+            "avg_run_seconds": round(self.total_run / finished, 3) if finished else 0.0,
+        }
+
+    async def shutdown(self):
+        """Stop the workers and fail running and queued jobs, so their callers return."""
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+        while self.queue is not None and not self.queue.empty():
+            job = self.queue.get_nowait()
+            self.queue.task_done()
+            if not job.future.done():
+                job.future.set_exception(TranscodeShutdownError("Transcode executor shut down"))
+        self.pending.clear()
+
+# Global instance
+transcode_executor = TranscodeExecutor(settings.TRANSCODE_WORKERS, settings.TRANSCODE_QUEUE_SIZE)
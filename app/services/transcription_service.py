@@ -1,46 +1,50 @@
 import uuid
 import asyncio
-from sqlmodel import Session
-from app.db import engine
+import base64
+import json
+from typing import AsyncIterator, List, Optional, Tuple
+from sqlalchemy import and_, func, or_
+from sqlmodel import select, delete
+from app.config import settings
+from app.db import async_session
 from app.models.transcription import Transcription
+from app.models.transcript_segment import TranscriptSegment
 from app.services.audio_processor import audio_processor
+from app.services.read_cache import invalidate_summary
+from app.utils.audio_metadata import probe_audio
 import logging
 from datetime import datetime
-import os
 
 logger = logging.getLogger(__name__)
 
-async def transcribe_and_save(meeting_id: str) -> Transcription:
-    """Transcribe the full meeting audio and save to database"""
+SEGMENT_INSERT_BATCH = 500
+# A pause longer than this starts a new segment
+SEGMENT_MAX_GAP_SECONDS = 1.5
+
+async def transcribe_and_save(meeting_id: str, audio_path: Optional[str] = None) -> Transcription:
+    """Transcribe the full meeting audio (or an uploaded file at audio_path) and save to database"""
     try:
-        audio_file_path = f"recordings/{meeting_id}_all.wav"
+        audio_file_path = audio_path or f"recordings/{meeting_id}_all.webm"
         # Log audio file existence and size
-        if not os.path.exists(audio_file_path):
-            logger.warning(f"[TRANSCRIBE] Audio file missing for meeting {meeting_id}: {audio_file_path}")
-        else:
-            size = os.path.getsize(audio_file_path)
-            logger.info(f"[TRANSCRIBE] Audio file for meeting {meeting_id}: {audio_file_path} ({size} bytes)")
-            if size < 1000:
+        try:
+            meta = probe_audio(audio_file_path)
+            logger.info(f"[TRANSCRIBE] Audio file for meeting {meeting_id}: {audio_file_path} ({meta.size} bytes, {meta.duration}s)")
+            if meta.size < 1000:
                 logger.warning(f"[TRANSCRIBE] Audio file for meeting {meeting_id} is very small (likely empty)")
+        except OSError:
+            logger.warning(f"[TRANSCRIBE] Audio file missing for meeting {meeting_id}: {audio_file_path}")
         # Process audio and get transcription
-        transcription_result = await audio_processor.process_meeting_audio(meeting_id)
+        transcription_result = await audio_processor.process_meeting_audio(meeting_id, audio_path)
         logger.info(f"[TRANSCRIBE] Transcription result for meeting {meeting_id}: '{transcription_result['text'][:100]}'")
         if not (transcription_result["text"] or "").strip():
             logger.warning(f"[TRANSCRIBE] Empty transcription for meeting {meeting_id}")
         
-        # Save transcription to database
-        transcription = Transcription(
-            id=str(uuid.uuid4()),
-            meeting_id=meeting_id,
-            content=transcription_result["text"],
-            speaker=None,  # Whisper doesn't provide speaker identification by default
-            timestamp=datetime.utcnow()
+        # Save transcription and its timed segments to database
+        transcription = await save_transcription(
+            meeting_id,
+            transcription_result["text"],
+            transcription_result["segments"]
         )
-        
-        with Session(engine) as s:
-            s.add(transcription)
-            s.commit()
-            s.refresh(transcription)
             
         logger.info(f"Transcription saved for meeting {meeting_id}")
         return transcription
@@ -49,18 +53,178 @@ async def transcribe_and_save(meeting_id: str) -> Transcription:
         logger.error(f"[TRANSCRIPTION ERROR] for meeting {meeting_id}: {e}", exc_info=True)
         return None
 
+def build_segments(words: List[dict], offset: float = 0.0) -> List[dict]:
+    """Group consecutive words into segments, split on speaker changes and pauses."""
+    segments = []
+    current = None
+    for w in words:
+        start = offset + w["start"]
+        end = offset + w["end"]
+        speaker = w.get("speaker")
+        speaker = None if speaker is None else str(speaker)
+        if current and current["speaker"] == speaker and start - current["end"] <= SEGMENT_MAX_GAP_SECONDS:
+            current["end"] = end
+        else:
+            current = {"start": start, "end": end, "speaker": speaker, "words": [], "confidences": []}
+            segments.append(current)
+        current["words"].append(w.get("punctuated_word") or w["word"])
+        if w.get("confidence") is not None:
+            current["confidences"].append(w["confidence"])
+    return [
+        {
+            "start": seg["start"],
+            "end": seg["end"],
+            "speaker": seg["speaker"],
+            "confidence": sum(seg["confidences"]) / len(seg["confidences"]) if seg["confidences"] else None,
+            "text": " ".join(seg["words"]),
+        }
+        for seg in segments
+    ]
+
+async def save_transcription(meeting_id: str, content: str, segments: List[dict]) -> Transcription:
+    """Save a transcription row and bulk insert its segments in one transaction."""
+    transcription = Transcription(
+        id=str(uuid.uuid4()),
+        meeting_id=meeting_id,
+        content=content,
+        speaker=None,
+        timestamp=datetime.utcnow()
+    )
+    now = datetime.utcnow()
+    rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "meeting_id": meeting_id,
+            "transcription_id": transcription.id,
+            "start": seg["start"],
+            "end": seg["end"],
+            "speaker": seg["speaker"],
+            "confidence": seg["confidence"],
+            "text": seg["text"],
+            "created_at": now,
+        }
+        for seg in segments
+    ]
+    async with async_session() as s:
+        s.add(transcription)
+        await s.flush()
+        for i in range(0, len(rows), SEGMENT_INSERT_BATCH):
+            await s.execute(TranscriptSegment.__table__.insert(), rows[i:i + SEGMENT_INSERT_BATCH])
+        await s.commit()
+    return transcription
+
+async def get_transcript_segments(meeting_id: str, start: Optional[float] = None,
+                                  end: Optional[float] = None) -> List[TranscriptSegment]:
+    """Get the segments of a meeting that start within [start, end), in time order"""
+    query = select(TranscriptSegment).where(TranscriptSegment.meeting_id == meeting_id)
+    if start is not None:
+        query = query.where(TranscriptSegment.start >= start)
+    if end is not None:
+        query = query.where(TranscriptSegment.start < end)
+    async with async_session() as s:
+        return (await s.exec(query.order_by(TranscriptSegment.start))).all()
+
+async def get_segments_saved_after(meeting_id: str,
+                                   after: Optional[Tuple[datetime, str]] = None) -> List[TranscriptSegment]:
+    """Segments of a meeting saved after a (created_at, id) keyset position, in that order.
+
+    Unlike start offsets, the save order only grows, also when a recording restarts.
+    """
+    query = select(TranscriptSegment).where(TranscriptSegment.meeting_id == meeting_id)
+    if after is not None:
+        created_at, segment_id = after
+        query = query.where(or_(
+            TranscriptSegment.created_at > created_at,
+            and_(TranscriptSegment.created_at == created_at, TranscriptSegment.id > segment_id)
+        ))
+    async with async_session() as s:
+        return (await s.exec(query.order_by(TranscriptSegment.created_at, TranscriptSegment.id))).all()
+
+async def get_transcript_end(meeting_id: str) -> float:
+    """End offset in seconds of the last saved segment of a meeting, 0 if there is none"""
+    async with async_session() as s:
+        end = (await s.exec(
+            select(func.max(TranscriptSegment.end)).where(TranscriptSegment.meeting_id == meeting_id)
+        )).first()
+    return end or 0.0
+
+def format_segments(segments: List[TranscriptSegment]) -> str:
+    return "\n".join(
+        f"Speaker {seg.speaker}: {seg.text}" if seg.speaker is not None else seg.text
+        for seg in segments
+    )
+
+async def get_transcript_text(meeting_id: str, start: Optional[float] = None,
+                              end: Optional[float] = None) -> str:
+    """Transcript text for a time range, with speaker labels when known.
+
+    Meetings transcribed before segments existed fall back to the full rows.
+    """
+    segments = await get_transcript_segments(meeting_id, start, end)
+    if segments:
+        return format_segments(segments)
+    if start is not None or end is not None:
+        return ""
+    async with async_session() as s:
+        transcriptions = (await s.exec(
+            select(Transcription)
+            .where(Transcription.meeting_id == meeting_id)
+            .order_by(Transcription.timestamp)
+        )).all()
+    return "\n".join(t.content for t in transcriptions)
+
+def _transcriptions_query(meeting_id: str, after: Optional[Tuple[datetime, str]] = None):
+    """Transcriptions of a meeting in (timestamp, id) order, optionally after a keyset position"""
+    query = select(Transcription).where(Transcription.meeting_id == meeting_id)
+    if after is not None:
+        timestamp, transcription_id = after
+        query = query.where(or_(
+            Transcription.timestamp > timestamp,
+            and_(Transcription.timestamp == timestamp, Transcription.id > transcription_id)
+        ))
+    return query.order_by(Transcription.timestamp, Transcription.id)
+
+def encode_cursor(transcription: Transcription) -> str:
+    data = json.dumps([transcription.timestamp.isoformat(), transcription.id])
+    return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Raises ValueError for a cursor that was not returned by encode_cursor"""
+    try:
+        timestamp, transcription_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(timestamp), str(transcription_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
 async def get_meeting_transcriptions(meeting_id: str) -> list:
     """Get all transcriptions for a meeting"""
-    with Session(engine) as s:
-        transcriptions = s.exec(
-            Session.query(Transcription).where(Transcription.meeting_id == meeting_id)
-        ).all()
+    async with async_session() as s:
+        transcriptions = (await s.exec(_transcriptions_query(meeting_id))).all()
     return transcriptions
 
+async def get_transcriptions_page(meeting_id: str, limit: int,
+                                  cursor: Optional[str] = None) -> Tuple[List[Transcription], Optional[str]]:
+    """One page of a meeting's transcriptions and the cursor of the next page (None on the last)"""
+    after = decode_cursor(cursor) if cursor else None
+    async with async_session() as s:
+        rows = (await s.exec(_transcriptions_query(meeting_id, after).limit(limit + 1))).all()
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+async def stream_meeting_transcriptions(meeting_id: str,
+                                        batch_size: int = settings.TRANSCRIPT_STREAM_BATCH) -> AsyncIterator[Transcription]:
+    """Yield a meeting's transcriptions from a server-side cursor, batch_size rows per fetch"""
+    async with async_session() as s:
+        result = await s.stream_scalars(
+            _transcriptions_query(meeting_id).execution_options(yield_per=batch_size)
+        )
+        async for transcription in result:
+            yield transcription
+
 async def delete_meeting_transcriptions(meeting_id: str):
     """Delete all transcriptions for a meeting"""
-    with Session(engine) as s:
-        s.exec(
-            Session.query(Transcription).where(Transcription.meeting_id == meeting_id).delete()
-        )
-        s.commit() 
\ No newline at end of file
+    async with async_session() as s:
+        await s.exec(delete(TranscriptSegment).where(TranscriptSegment.meeting_id == meeting_id))
+        await s.exec(delete(Transcription).where(Transcription.meeting_id == meeting_id))
+        await s.commit()
+    await invalidate_summary(meeting_id)
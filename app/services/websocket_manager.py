@@ -1,8 +1,13 @@
+import logging
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from app.config import settings
 from app.services.transcription_service import transcribe_and_save, get_meeting_transcriptions
 from app.services.insight_generator import generate_and_save
+from app.services.summary_feed import summary_feed
 from typing import Dict, List
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 sessions = {}
 
@@ -31,46 +36,42 @@ async def ws_chat(ws: WebSocket, meeting_id: str):
 @router.websocket("/ws/audio/{meeting_id}")
 async def ws_audio(ws: WebSocket, meeting_id: str):
     await ws.accept()
-    from app.services.transcription_service import transcribe_and_save
+    from app.services.audio_processor import audio_processor
+    from app.services.incremental_transcriber import incremental_transcriber
+    await incremental_transcriber.open(meeting_id)
+    if settings.LIVE_SUMMARY_ENABLED:
+        from app.services.live_summarizer import live_summarizer
+        live_summarizer.start(meeting_id)
     try:
         while True:
             chunk = await ws.receive_bytes()
-            from app.services.audio_processor import audio_processor
             await audio_processor.save_audio_chunk(meeting_id, chunk)
-            # Transcribe and save after each chunk (real-time)
-            try:
-                await transcribe_and_save(meeting_id)
-            except Exception:
-                pass
+            # Transcribe newly arrived audio in windows (real-time)
+            incremental_transcriber.add_chunk(meeting_id, len(chunk))
     except:
-        # On disconnect, do nothing (transcription is already up-to-date)
         pass
+    finally:
+        # Flush the audio received since the last window
+        await incremental_transcriber.close(meeting_id)
 
 # --- Summary WebSocket ---
-summary_connections = {}
-
 @router.websocket("/ws/summary/{meeting_id}")
 async def ws_summary(ws: WebSocket, meeting_id: str):
     await ws.accept()
-    if meeting_id not in summary_connections:
-        summary_connections[meeting_id] = []
-    summary_connections[meeting_id].append(ws)
+    # Updates can come from pipeline workers in other processes, so they are relayed through the database
+    summary_feed.subscribe(meeting_id, ws)
     try:
         while True:
             await ws.receive_text()  # Keep connection alive, but ignore messages
     except WebSocketDisconnect:
-        summary_connections[meeting_id].remove(ws)
-        if not summary_connections[meeting_id]:
-            del summary_connections[meeting_id]
+        summary_feed.unsubscribe(meeting_id, ws)
 
-# Utility function to broadcast summary to all clients
+# Utility function to broadcast summary to all clients, from any process
 async def broadcast_summary(meeting_id: str, summary_data: dict):
-    if meeting_id in summary_connections:
-        for ws in summary_connections[meeting_id]:
-            try:
-                await ws.send_json({"type": "summary", **summary_data})
-            except Exception:
-                pass
+    try:
+        await summary_feed.publish(meeting_id, summary_data)
+    except Exception as e:
+        logger.error(f"[SUMMARY FEED] Could not publish summary for meeting {meeting_id}: {e}")
 
 class ConnectionManager:
     def __init__(self):
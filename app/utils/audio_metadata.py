@@ -0,0 +1,251 @@
+import os
+import struct
+import logging
+from functools import lru_cache
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Header bytes are enough for every container we probe
+HEADER_READ_BYTES = 64 * 1024
+# How far back from the end of a WebM file to look for the last cluster
+TAIL_READ_BYTES = 512 * 1024
+METADATA_CACHE_SIZE = 512
+
+WAV_FORMATS = {1: "pcm", 3: "pcm_float", 6: "alaw", 7: "mulaw", 0xFFFE: "pcm_extensible"}
+
+# EBML / Matroska element IDs
+EBML_HEADER = 0x1A45DFA3
+EBML_DOCTYPE = 0x4282
+SEGMENT = 0x18538067
+INFO = 0x1549A966
+TIMECODE_SCALE = 0x2AD7B1
+DURATION = 0x4489
+TRACKS = 0x1654AE6B
+TRACK_ENTRY = 0xAE
+TRACK_TYPE = 0x83
+CODEC_ID = 0x86
+AUDIO = 0xE1
+SAMPLING_FREQUENCY = 0xB5
+CHANNELS = 0x9F
+CLUSTER = 0x1F43B675
+CLUSTER_TIMECODE = 0xE7
+SIMPLE_BLOCK = 0xA3
+BLOCK_GROUP = 0xA0
+BLOCK = 0xA1
+CLUSTER_ID_BYTES = b"\x1f\x43\xb6\x75"
+
+class AudioMetadata:
+    def __init__(self, container: Optional[str] = None, codec: Optional[str] = None,
+                 sample_rate: Optional[int] = None, channels: Optional[int] = None,
+                 duration: Optional[float] = None, size: int = 0, estimated: bool = False):
+        self.container = container
+        self.codec = codec
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.duration = duration
+        self.size = size
+        # True when the duration was derived from the last cluster rather than a header field
+        self.estimated = estimated
+
+    def to_dict(self) -> dict:
+        return {
+            "container": self.container,
+            "codec": self.codec,
+            "sample_rate": self.sample_rate,
+            "channels": self.channels,
+            "duration": self.duration,
+            "size": self.size,
+            "estimated": self.estimated,
+        }
+
+def sniff_format(header: bytes) -> Optional[str]:
+    """Identify an audio container from its first bytes."""
+    if header[:4] == b"RIFF" and header[8:12] == b"WAVE":
+        return "wav"
+    if header[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    if header[:4] == b"fLaC":
+        return "flac"
+    if header[:4] == b"OggS":
+        return "ogg"
+    if header[4:8] == b"ftyp":
+        return "m4a"
+    if header[:3] == b"ID3" or (len(header) > 1 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0):
+        return "mp3"
+    return None
+
+def probe_audio(path: str) -> AudioMetadata:
+    """Read audio metadata from container headers only, cached per path + mtime."""
+    st = os.stat(path)
+    return _probe_cached(path, st.st_mtime_ns, st.st_size)
+
+@lru_cache(maxsize=METADATA_CACHE_SIZE)
+def _probe_cached(path: str, mtime_ns: int, size: int) -> AudioMetadata:
+    with open(path, "rb") as f:
+        header = f.read(HEADER_READ_BYTES)
+        container = sniff_format(header)
+        try:
+            if container == "wav":
+                return _probe_wav(header, size)
+            if container == "webm":
+                return _probe_webm(f, header, size)
+        except Exception as e:
+            logger.warning(f"[AUDIO] Could not parse {container} header of {path}: {e}")
+    return AudioMetadata(container=container, size=size)
+
+def _probe_wav(header: bytes, size: int) -> AudioMetadata:
+    meta = AudioMetadata(container="wav", size=size)
+    pos = 12
+    byte_rate = 0
+    while pos + 8 <= len(header):
+        chunk_id = header[pos:pos + 4]
+        chunk_size = struct.unpack_from("<I", header, pos + 4)[0]
+        body = pos + 8
+        if chunk_id == b"fmt ":
+            fmt_tag, channels, rate, byte_rate, _, bits = struct.unpack_from("<HHIIHH", header, body)
+            meta.codec = WAV_FORMATS.get(fmt_tag, f"wav_0x{fmt_tag:04x}")
+            if fmt_tag in (1, 0xFFFE):
+                meta.codec = f"pcm_s{bits}le" if bits > 8 else "pcm_u8"
+            meta.channels = channels
+            meta.sample_rate = rate
+        elif chunk_id == b"data":
+            # Streaming writers leave the size as 0 or 0xFFFFFFFF; trust the file size then
+            data_size = chunk_size
+            if data_size in (0, 0xFFFFFFFF) or body + data_size > size:
+                data_size = size - body
+            if byte_rate:
+                meta.duration = data_size / float(byte_rate)
+            break
+        pos = body + chunk_size + (chunk_size & 1)
+    return meta
+
+def _read_vint(data: bytes, pos: int, keep_marker: bool) -> Tuple[Optional[int], int]:
+    """Decode an EBML variable-length integer. Returns (value, length); value is None when unknown."""
+    first = data[pos]
+    if first == 0:
+        raise ValueError("Invalid EBML vint")
+    length = 1
+    mask = 0x80
+    while not first & mask:
+        mask >>= 1
+        length += 1
+    if len(data) < pos + length:
+        raise ValueError("Truncated EBML vint")
+    value = first if keep_marker else first & (mask - 1)
+    all_ones = value == mask - 1
+    for b in data[pos + 1:pos + length]:
+        value = (value << 8) | b
+        all_ones = all_ones and b == 0xFF
+    if not keep_marker and all_ones:
+        return None, length
+    return value, length
+
+def _read_element(data: bytes, pos: int) -> Tuple[int, Optional[int], int]:
+    """Returns (element id, payload size or None if unknown, payload offset)."""
+    element_id, id_len = _read_vint(data, pos, keep_marker=True)
+    size, size_len = _read_vint(data, pos + id_len, keep_marker=False)
+    return element_id, size, pos + id_len + size_len
+
+def _uint(data: bytes) -> int:
+    return int.from_bytes(data, "big")
+
+def _float(data: bytes) -> float:
+    return struct.unpack(">f" if len(data) == 4 else ">d", data)[0]
+
+def _probe_webm(f, header: bytes, size: int) -> AudioMetadata:
+    meta = AudioMetadata(container="webm", size=size)
+    timecode_scale = 1000000
+    duration = None
+    tracks = []
+    # Master elements are descended into; everything else is skipped
+    masters = {EBML_HEADER, SEGMENT, INFO, TRACKS, TRACK_ENTRY, AUDIO}
+    pos = 0
+    while pos < len(header):
+        element_id, length, body = _read_element(header, pos)
+        if element_id == CLUSTER:
+            break
+        if element_id in masters:
+            if element_id == TRACK_ENTRY:
+                tracks.append({})
+            pos = body
+            continue
+        if length is None:
+            raise ValueError(f"Unknown size for element 0x{element_id:X}")
+        payload = header[body:body + length]
+        if element_id == EBML_DOCTYPE:
+            meta.container = payload.decode(errors="replace")
+        elif element_id == TIMECODE_SCALE:
+            timecode_scale = _uint(payload)
+        elif element_id == DURATION:
+            duration = _float(payload)
+        elif tracks and element_id == TRACK_TYPE:
+            tracks[-1]["type"] = _uint(payload)
+        elif tracks and element_id == CODEC_ID:
+            tracks[-1]["codec"] = payload.decode(errors="replace")
+        elif tracks and element_id == SAMPLING_FREQUENCY:
+            tracks[-1]["sample_rate"] = int(_float(payload))
+        elif tracks and element_id == CHANNELS:
+            tracks[-1]["channels"] = _uint(payload)
+        pos = body + length
+
+    audio = next((t for t in tracks if t.get("type") == 2), tracks[0] if tracks else {})
+    meta.codec = audio.get("codec")
+    meta.sample_rate = audio.get("sample_rate")
+    meta.channels = audio.get("channels")
+    if duration is not None:
+        meta.duration = duration * timecode_scale / 1e9
+    else:
+        # Live recordings (MediaRecorder) never write Duration; use the last block's timecode
+        last = _last_block_timecode(f, size)
+        if last is not None:
+            meta.duration = last * timecode_scale / 1e9
+            meta.estimated = True
+    return meta
+
+def _last_block_timecode(f, size: int) -> Optional[int]:
+    start = max(0, size - TAIL_READ_BYTES)
+    f.seek(start)
+    tail = f.read()
+    end = len(tail)
+    while True:
+        pos = tail.rfind(CLUSTER_ID_BYTES, 0, end)
+        if pos < 0:
+            return None
+        latest = _scan_cluster(tail, pos)
+        if latest is not None:
+            return latest
+        # Not a real cluster (the ID bytes occurred inside a frame); keep looking
+        end = pos
+
+def _scan_cluster(data: bytes, pos: int) -> Optional[int]:
+    try:
+        _, length, body = _read_element(data, pos)
+        element_id, child_len, child_body = _read_element(data, body)
+    except (ValueError, IndexError):
+        return None
+    if element_id != CLUSTER_TIMECODE or child_len is None:
+        return None
+    end = len(data) if length is None else min(len(data), body + length)
+    cluster_time = _uint(data[child_body:child_body + child_len])
+    latest = cluster_time
+    pos = child_body + child_len
+    while pos < end:
+        try:
+            element_id, child_len, child_body = _read_element(data, pos)
+            if child_len is None or child_body + child_len > len(data):
+                break
+            if element_id == BLOCK_GROUP:
+                pos = child_body
+                continue
+            if element_id in (SIMPLE_BLOCK, BLOCK):
+                _, track_len = _read_vint(data, child_body, keep_marker=False)
+                relative = struct.unpack_from(">h", data, child_body + track_len)[0]
+                latest = max(latest, cluster_time + relative)
+            elif element_id == CLUSTER:
+                break
+        except (ValueError, IndexError, struct.error):
+            # Trailing partial element of a recording that is still being written
+            break
+        pos = child_body + child_len
+    return latest
@@ -1,13 +1,125 @@
 import wave
-from typing import List
+import numpy as np
+from typing import List, Optional
 
-def merge_wav_files(input_files: List[str], output_file: str):
-    data = []
+BLOCK_FRAMES = 64 * 1024
+
+def pcm_to_float(data: bytes, sample_width: int, channels: int) -> np.ndarray:
+    """Decode little-endian PCM into a (frames, channels) float32 array in [-1, 1]."""
+    if sample_width == 1:
+        samples = (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sample_width == 2:
+        samples = np.frombuffer(data, dtype='<i2').astype(np.float32) / 32768.0
+    elif sample_width == 3:
+        raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        ints = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        ints = np.where(ints & 0x800000, ints - 0x1000000, ints)
+        samples = ints.astype(np.float32) / 8388608.0
+    elif sample_width == 4:
+        samples = np.frombuffer(data, dtype='<i4').astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"Unsupported sample width: {sample_width}")
+    return samples.reshape(-1, channels)
+
+def float_to_pcm(samples: np.ndarray, sample_width: int) -> bytes:
+    """Encode a float array in [-1, 1] as little-endian PCM of the given width."""
+    samples = np.clip(samples.reshape(-1), -1.0, 1.0)
+    if sample_width == 1:
+        return (np.round(samples * 127.0) + 128).astype(np.uint8).tobytes()
+    if sample_width == 2:
+        return np.round(samples * 32767.0).astype('<i2').tobytes()
+    if sample_width == 3:
+        ints = np.round(samples * 8388607.0).astype(np.int32)
+        out = np.empty((ints.size, 3), dtype=np.uint8)
+        out[:, 0] = ints & 0xFF
+        out[:, 1] = (ints >> 8) & 0xFF
+        out[:, 2] = (ints >> 16) & 0xFF
+        return out.tobytes()
+    if sample_width == 4:
+        return np.round(samples.astype(np.float64) * 2147483647.0).astype('<i4').tobytes()
+    raise ValueError(f"Unsupported sample width: {sample_width}")
+
+def convert_channels(samples: np.ndarray, channels: int) -> np.ndarray:
+    """Downmix by averaging or upmix by repeating the mono mix."""
+    if samples.shape[1] == channels:
+        return samples
+    mono = samples.mean(axis=1, keepdims=True)
+    return np.repeat(mono, channels, axis=1)
+
+class LinearResampler:
+    """Streaming linear-interpolation resampler that carries state across blocks."""
+    def __init__(self, src_rate: int, dst_rate: int, channels: int):
+        self.step = src_rate / float(dst_rate)
+        self.channels = channels
+        self.prev = None  # last input frame of the previous block
+        self.consumed = 0  # input frames seen so far
+        self.produced = 0  # output frames emitted so far
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        if block.size == 0:
+            return block
+        if self.prev is None:
+            frames = block
+            base = self.consumed
+        else:
+            frames = np.vstack([self.prev, block])
+            base = self.consumed - 1
+        self.consumed += len(block)
+        last = self.consumed - 1
+        first_out = self.produced
+        last_out = int(np.floor(last / self.step))
+        self.prev = block[-1:]
+        if last_out < first_out:
+            return np.empty((0, self.channels), dtype=np.float32)
+        positions = np.arange(first_out, last_out + 1) * self.step - base
+        self.produced = last_out + 1
+        left = np.floor(positions).astype(np.int64)
+        right = np.minimum(left + 1, len(frames) - 1)
+        frac = (positions - left)[:, None].astype(np.float32)
+        return frames[left] * (1.0 - frac) + frames[right] * frac
+
+def merge_wav_files(input_files: List[str], output_file: str,
+                    sample_rate: Optional[int] = None,
+                    sample_width: Optional[int] = None,
+                    channels: Optional[int] = None,
+                    block_frames: int = BLOCK_FRAMES):
+    """Concatenate WAV files block by block, so memory use does not grow with the audio.
+
+    The output format defaults to the first file's. Inputs in another format are
+    converted (width, channels, sample rate) on the fly; matching inputs are
+    copied without decoding.
+    """
+    if not input_files:
+        raise ValueError("No input files to merge")
+
+    headers = []
     for infile in input_files:
         with wave.open(infile, 'rb') as w:
-            data.append([w.getparams(), w.readframes(w.getnframes())])
-    output = wave.open(output_file, 'wb')
-    output.setparams(data[0][0])
-    for params, frames in data:
-        output.writeframes(frames)
-    output.close() 
\ No newline at end of file
+            headers.append((w.getframerate(), w.getsampwidth(), w.getnchannels(), w.getnframes()))
+    rate = sample_rate or headers[0][0]
+    width = sample_width or headers[0][1]
+    nchannels = channels or headers[0][2]
+    total_frames = sum(int(np.ceil(n * rate / float(r))) for r, _, _, n in headers)
+
+    with wave.open(output_file, 'wb') as output:
+        output.setnchannels(nchannels)
+        output.setsampwidth(width)
+        output.setframerate(rate)
+        # Header is written up front; wave patches it on close if resampling rounding differs
+        output.setnframes(total_frames)
+        for infile, (in_rate, in_width, in_channels, _) in zip(input_files, headers):
+            same_format = (in_rate, in_width, in_channels) == (rate, width, nchannels)
+            resampler = LinearResampler(in_rate, rate, nchannels) if in_rate != rate else None
+            with wave.open(infile, 'rb') as w:
+                while True:
+                    frames = w.readframes(block_frames)
+                    if not frames:
+                        break
+                    if same_format:
+                        output.writeframesraw(frames)
+                        continue
+                    samples = pcm_to_float(frames, in_width, in_channels)
+                    samples = convert_channels(samples, nchannels)
+                    if resampler:
+                        samples = resampler.process(samples)
+                    output.writeframesraw(float_to_pcm(samples, width))
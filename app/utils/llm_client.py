@@ -0,0 +1,149 @@
+import asyncio
+import random
+import time
+import logging
+from typing import Awaitable, Callable, List, Optional
+import openai
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+class LLMUnavailableError(Exception):
+    """The LLM API kept failing with rate limits or server errors after all retries."""
+
+class TokenBudget:
+    """Token bucket refilled at tokens_per_minute, so bursts wait instead of hitting 429s."""
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = tokens_per_minute
+        self.rate = tokens_per_minute / 60.0
+        self.tokens = float(tokens_per_minute)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, tokens: int):
+        if self.capacity <= 0:
+            return
+        # A request larger than the whole budget waits for a full bucket
+        tokens = min(tokens, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+    def settle(self, reserved: int, used: int):
+        """Correct a reservation once the actual usage is known."""
+        if self.capacity <= 0:
+            return
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + reserved - used)
+
+class LLMClient:
+    """Shared async chat completion client.
+
+    One pooled AsyncOpenAI client for the whole process, a cap on in-flight
+    requests, a tokens-per-minute budget and jittered retries on 429 and 5xx.
+    """
+    def __init__(self):
+        self.client = openai.AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            timeout=settings.LLM_TIMEOUT_SECONDS,
+            # Retries are handled here, inside the concurrency and token limits
+            max_retries=0
+        )
+        self.semaphore = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+        self.budget = TokenBudget(settings.LLM_TOKENS_PER_MINUTE)
+
+    async def complete(self, messages: List[dict], max_tokens: Optional[int] = None,
+                       temperature: Optional[float] = None,
+                       on_delta: Optional[Callable[[str], Awaitable[None]]] = None) -> str:
+        """Return the completion text. With on_delta the response is streamed and each piece passed to it."""
+        max_tokens = max_tokens or settings.LLM_MAX_TOKENS
+        # Prompt tokens estimated at about 4 characters per token
+        reserved = sum(len(m["content"]) for m in messages) // 4 + max_tokens
+        await self.budget.acquire(reserved)
+        usage = {"total_tokens": reserved}
+        try:
+            for attempt in range(settings.LLM_MAX_RETRIES + 1):
+                emitted = []
+                try:
+                    async with self.semaphore:
+                        request = dict(
+                            model=settings.LLM_MODEL,
+                            messages=messages,
+                            max_tokens=max_tokens,
+                            temperature=settings.LLM_TEMPERATURE if temperature is None else temperature
+                        )
+                        if on_delta is None:
+                            response = await self.client.chat.completions.create(**request)
+                            if response.usage:
+                                usage["total_tokens"] = response.usage.total_tokens
+                            return response.choices[0].message.content
+                        return await self._stream(request, on_delta, emitted, usage)
+                except Exception as e:
+                    # Once text reached the caller a retry would repeat it
+                    if emitted or not self.is_retryable(e):
+                        raise
+                    if attempt == settings.LLM_MAX_RETRIES:
+                        raise LLMUnavailableError(str(e)) from e
+                    delay = self.retry_delay(e, attempt)
+                    logger.warning(f"[LLM] {type(e).__name__}, retrying in {delay:.1f}s (attempt {attempt + 1})")
+                    await asyncio.sleep(delay)
+        finally:
+            self.budget.settle(reserved, usage["total_tokens"])
+
+    async def _stream(self, request: dict, on_delta: Callable[[str], Awaitable[None]],
+                      emitted: List[str], usage: dict) -> str:
+        stream = await self.client.chat.completions.create(
+            stream=True, stream_options={"include_usage": True}, **request
+        )
+        async for chunk in stream:
+            if chunk.usage:
+                usage["total_tokens"] = chunk.usage.total_tokens
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                emitted.append(delta)
+                await on_delta(delta)
+        return "".join(emitted)
+
+    def is_retryable(self, e: Exception) -> bool:
+        if isinstance(e, (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError)):
+            return True
+        return isinstance(e, openai.APIStatusError) and e.status_code >= 500
+
+    def retry_delay(self, e: Exception, attempt: int) -> float:
+        """Full jitter exponential backoff, but never shorter than the server's Retry-After."""
+        delay = random.uniform(0, min(settings.LLM_RETRY_MAX_SECONDS, settings.LLM_RETRY_BASE_SECONDS * 2 ** attempt))
+        response = getattr(e, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        try:
+            return max(delay, float(retry_after)) if retry_after else delay
+        except ValueError:
+            return delay
+
+    async def close(self):
+        await self.client.close()
+
+_client: Optional[LLMClient] = None
+
+def get_llm_client() -> LLMClient:
+    """Return the process-wide LLM client, created on first use."""
+    global _client
+    if _client is None:
+        _client = LLMClient()
+    return _client
+
+async def close_llm_client():
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
@@ -1,18 +1,18 @@
-import openai
 import asyncio
+import hashlib
 from app.config import settings
+from app.utils.llm_client import get_llm_client, LLMUnavailableError
 import logging
-import os
+from typing import Awaitable, Callable, List, Optional
 
 logger = logging.getLogger(__name__)
 
-# Configure OpenAI
-openai.api_key = settings.OPENAI_API_KEY
+DeltaCallback = Callable[[str], Awaitable[None]]
 
-async def get_insights_from_transcript(transcript: str) -> str:
-    """Generate meeting insights from transcript using OpenAI GPT-4.1-nano (new API)"""
-    
-    system_prompt = '''You are an expert meeting analyst. Your job is to analyze the provided meeting transcript and extract the following, using clear, concise bullet points for each section:
+# Merge levels before everything left is reduced in one call, whatever its size
+MAX_REDUCE_DEPTH = 8
+
+INSIGHTS_SYSTEM_PROMPT = '''You are an expert meeting analyst. Your job is to analyze the provided meeting transcript and extract the following, using clear, concise bullet points for each section:
 
 # Meeting Summary
 - Summarize the main topics, goals, and outcomes of the meeting in 3-6 bullet points.
@@ -35,23 +35,130 @@ async def get_insights_from_transcript(transcript: str) -> str:
 
 Always use the above structure and headings. Separate each section with '---'. Do not include any content outside these sections. Be as informative and actionable as possible.'''
 
-    try:
-        response = await asyncio.to_thread(
-            lambda: openai.chat.completions.create(
-                model="gpt-4.1-nano",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"Please analyze this meeting transcript:\n\n{transcript}"}
-                ],
-                max_tokens=1000,
-                temperature=0.3
+FALLBACK_INSIGHTS = "# Meeting Summary\nUnable to generate summary due to technical issues.\n\n---\n# Action Items\nNone identified.\n\n---\n# Key Decisions\nNone identified."
+
+MAP_SYSTEM_PROMPT = INSIGHTS_SYSTEM_PROMPT + "\n\nYou are given one consecutive part of a longer meeting. Only report what appears in this part."
+
+REDUCE_SYSTEM_PROMPT = INSIGHTS_SYSTEM_PROMPT + "\n\nYou are given analyses of consecutive parts of one meeting, in order. Merge them into a single analysis of the whole meeting: combine overlapping points, keep every distinct action item and decision, and drop \"None identified.\" entries when another part has content."
+
+UPDATE_SYSTEM_PROMPT = INSIGHTS_SYSTEM_PROMPT + "\n\nThe meeting is still in progress. You are given the current analysis of the meeting so far and the newest part of its transcript. Return the updated analysis of the whole meeting so far, keeping earlier points that still apply."
+
+# Any edit to the prompts that produce final insights changes the fingerprint, so cached insights are not reused;
+# meetings summarized while live end with an update pass
+INSIGHTS_PROMPT_HASH = hashlib.sha256(
+    "\0".join([INSIGHTS_SYSTEM_PROMPT, MAP_SYSTEM_PROMPT, REDUCE_SYSTEM_PROMPT, UPDATE_SYSTEM_PROMPT]).encode("utf-8")
+).hexdigest()[:16]
+
+def insights_fingerprint() -> str:
+    """Identifies the prompt/model combination that produced an insight."""
+    return f"{settings.LLM_MODEL}:{INSIGHTS_PROMPT_HASH}:{settings.INSIGHTS_CHUNK_TOKENS}"
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token for English)."""
+    return len(text) // 4 + 1
+
+def chunk_transcript(transcript: str, max_tokens: int) -> List[str]:
+    """Split a transcript on line boundaries into chunks of at most max_tokens."""
+    chunks, current, current_tokens = [], [], 0
+    for line in transcript.splitlines():
+        # A single line longer than the budget is split on characters
+        pieces = [line[i:i + max_tokens * 4] for i in range(0, len(line), max_tokens * 4)] or [line]
+        for piece in pieces:
+            tokens = estimate_tokens(piece)
+            if current and current_tokens + tokens > max_tokens:
+                chunks.append("\n".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+async def _complete(system_prompt: str, user_content: str, on_delta: Optional[DeltaCallback] = None) -> str:
+    return await get_llm_client().complete([
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_content}
+    ], on_delta=on_delta)
+
+async def _map_reduce(transcript: str, on_delta: Optional[DeltaCallback] = None) -> str:
+    """Summarize chunks concurrently, then merge the partial analyses. Only the final merge is streamed."""
+    chunks = chunk_transcript(transcript, settings.INSIGHTS_CHUNK_TOKENS)
+    semaphore = asyncio.Semaphore(settings.INSIGHTS_MAX_PARALLEL)
+
+    async def map_chunk(index: int, chunk: str) -> str:
+        async with semaphore:
+            return await _complete(
+                MAP_SYSTEM_PROMPT,
+                f"Please analyze part {index + 1} of {len(chunks)} of this meeting transcript:\n\n{chunk}"
             )
+
+    logger.info(f"[INSIGHTS] Summarizing transcript in {len(chunks)} chunks")
+    partials = await asyncio.gather(*(map_chunk(i, c) for i, c in enumerate(chunks)))
+    return await _reduce(list(partials), semaphore, on_delta)
+
+async def _reduce(partials: List[str], semaphore: asyncio.Semaphore,
+                  on_delta: Optional[DeltaCallback] = None, depth: int = 0) -> str:
+    # Very long meetings can produce more partials than fit in one prompt; merge in groups
+    groups, current = [], []
+    for partial in partials:
+        if current and estimate_tokens("\n\n".join(current + [partial])) > settings.INSIGHTS_CHUNK_TOKENS:
+            groups.append(current)
+            current = []
+        current.append(partial)
+    groups.append(current)
+    if len(groups) == len(partials) > 1:
+        # No two partials fit in the budget together; merge pairs anyway so every level halves the list
+        groups = [partials[i:i + 2] for i in range(0, len(partials), 2)]
+    if depth >= MAX_REDUCE_DEPTH:
+        groups = [partials]
+
+    async def reduce_group(group: List[str], on_delta: Optional[DeltaCallback] = None) -> str:
+        numbered = "\n\n".join(f"## Part {i + 1}\n{p}" for i, p in enumerate(group))
+        async with semaphore:
+            return await _complete(REDUCE_SYSTEM_PROMPT, f"Please merge these partial meeting analyses:\n\n{numbered}", on_delta)
+
+    if len(groups) == 1:
+        return await reduce_group(groups[0], on_delta)
+    merged = await asyncio.gather(*(reduce_group(g) for g in groups))
+    return await _reduce(list(merged), semaphore, on_delta, depth + 1)
+
+async def get_insights_from_transcript(transcript: str, on_delta: Optional[DeltaCallback] = None) -> str:
+    """Generate meeting insights from transcript using the configured OpenAI model.
+
+    Transcripts longer than INSIGHTS_CHUNK_TOKENS are summarized map-reduce style.
+    Raises LLMUnavailableError when the API stays rate limited or down, so the
+    job is retried instead of saving the fallback text. With on_delta the
+    final completion is streamed to it as it is generated.
+    """
+    try:
+        if estimate_tokens(transcript) > settings.INSIGHTS_CHUNK_TOKENS:
+            return await _map_reduce(transcript, on_delta)
+        return await _complete(
+            INSIGHTS_SYSTEM_PROMPT,
+            f"Please analyze this meeting transcript:\n\n{transcript}",
+            on_delta
         )
-        return response.choices[0].message.content
+    except LLMUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"OpenAI API call failed: {e}")
-        return f"# Meeting Summary\nUnable to generate summary due to technical issues.\n\n---\n# Action Items\nNone identified.\n\n---\n# Key Decisions\nNone identified."
+        return FALLBACK_INSIGHTS
+
+async def update_insights(previous: str, new_transcript: str) -> str:
+    """Fold newly arrived transcript text into a running analysis. Raises on API failure."""
+    if not previous:
+        if estimate_tokens(new_transcript) > settings.INSIGHTS_CHUNK_TOKENS:
+            return await _map_reduce(new_transcript)
+        return await _complete(INSIGHTS_SYSTEM_PROMPT, f"Please analyze this meeting transcript:\n\n{new_transcript}")
+    if estimate_tokens(previous) + estimate_tokens(new_transcript) > settings.INSIGHTS_CHUNK_TOKENS:
+        # Analyze the long delta on its own, then merge it with the running analysis
+        partial = await _map_reduce(new_transcript)
+        return await _reduce([previous, partial], asyncio.Semaphore(settings.INSIGHTS_MAX_PARALLEL))
+    return await _complete(
+        UPDATE_SYSTEM_PROMPT,
+        f"Current analysis:\n\n{previous}\n\nNewest part of the transcript:\n\n{new_transcript}"
+    )
 
 # def get_insights_from_transcript_sync(transcript: str) -> str:
 #     """Synchronous version for backward compatibility"""
-#     return asyncio.run(get_insights_from_transcript(transcript)) 
\ No newline at end of file
+#     return asyncio.run(get_insights_from_transcript(transcript))
@@ -0,0 +1,80 @@
+from typing import AsyncIterator, List
+from fastapi import Request
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+class UploadFormError(ValueError):
+    """The request body is not a multipart form with the expected file field."""
+
+async def iter_form_file(request: Request, field: str, chunk_size: int) -> AsyncIterator[bytes]:
+    """Yield the content of one file field of a multipart request as the body arrives.
+
+    Unlike an UploadFile parameter, nothing is spooled before the caller sees
+    the first bytes, so it can reject an upload part way through. Chunks are
+    at least chunk_size bytes except the last. Other fields are skipped.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise UploadFormError("Expected a multipart/form-data body")
+
+    header_field = bytearray()
+    header_value = bytearray()
+    headers = {}
+    state = {"in_field": False, "found": False, "done": False}
+    received: List[bytes] = []
+
+    def on_part_begin():
+        headers.clear()
+
+    def on_header_field(data: bytes, start: int, end: int):
+        header_field.extend(data[start:end])
+
+    def on_header_value(data: bytes, start: int, end: int):
+        header_value.extend(data[start:end])
+
+    def on_header_end():
+        headers[bytes(header_field).lower()] = bytes(header_value)
+        header_field.clear()
+        header_value.clear()
+
+    def on_headers_finished():
+        _, options = parse_options_header(headers.get(b"content-disposition", b""))
+        # Only the first part with the field name is read
+        state["in_field"] = not state["found"] and options.get(b"name") == field.encode()
+        state["found"] = state["found"] or state["in_field"]
+
+    def on_part_data(data: bytes, start: int, end: int):
+        if state["in_field"]:
+            received.append(data[start:end])
+
+    def on_part_end():
+        if state["in_field"]:
+            state["in_field"] = False
+            state["done"] = True
+
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+    pending = bytearray()
+    async for body_chunk in request.stream():
+        parser.write(body_chunk)
+        for data in received:
+            pending.extend(data)
+        received.clear()
+        while len(pending) >= chunk_size:
+            yield bytes(pending[:chunk_size])
+            del pending[:chunk_size]
+        if state["done"]:
+            break
+    if not state["found"]:
+        raise UploadFormError(f"Missing file field '{field}'")
+    if not state["done"]:
+        raise UploadFormError("Upload ended before the file was complete")
+    if pending:
+        yield bytes(pending)
@@ -0,0 +1,124 @@
+import bisect
+import wave
+import numpy as np
+from typing import List, Optional, Tuple
+
+BLOCK_SECONDS = 30
+
+class TimeMap:
+    """Maps offsets in trimmed audio back to offsets in the original recording."""
+    def __init__(self, spans: List[Tuple[float, float]]):
+        # spans are (original_start, original_end) of the audio that was kept, in order
+        self.spans = spans
+        self.trimmed_starts = []
+        position = 0.0
+        for start, end in spans:
+            self.trimmed_starts.append(position)
+            position += end - start
+        self.trimmed_duration = position
+
+    def to_original(self, t: float) -> float:
+        if not self.spans:
+            return t
+        i = max(0, bisect.bisect_right(self.trimmed_starts, t) - 1)
+        start, end = self.spans[i]
+        return min(end, start + (t - self.trimmed_starts[i]))
+
+    def remap_words(self, words: List[dict]) -> List[dict]:
+        remapped = []
+        for w in words:
+            w = dict(w)
+            w["start"] = self.to_original(w["start"])
+            w["end"] = max(w["start"], self.to_original(w["end"]))
+            remapped.append(w)
+        return remapped
+
+def frame_features(samples: np.ndarray, frame_len: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-frame energy (dBFS) and zero-crossing rate of int16 samples."""
+    n = len(samples) // frame_len
+    if n == 0:
+        return np.empty(0), np.empty(0)
+    frames = samples[:n * frame_len].astype(np.float32).reshape(n, frame_len) / 32768.0
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    energy_db = 20.0 * np.log10(np.maximum(rms, 1e-10))
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / float(frame_len - 1)
+    return energy_db, zcr
+
+def speech_mask(energy_db: np.ndarray, zcr: np.ndarray, energy_threshold_db: float,
+                zcr_threshold: float, padding_frames: int, min_silence_frames: int) -> np.ndarray:
+    """Mark speech frames, pad them and close silent gaps too short to be worth cutting."""
+    # Quiet but noisy frames are usually unvoiced consonants, so they get a lower energy bar
+    speech = (energy_db > energy_threshold_db) | (
+        (energy_db > energy_threshold_db - 10.0) & (zcr > zcr_threshold)
+    )
+    if padding_frames > 0 and speech.any():
+        kernel = np.ones(2 * padding_frames + 1, dtype=np.int32)
+        speech = np.convolve(speech.astype(np.int32), kernel, mode="same") > 0
+    # Fill silences shorter than min_silence_frames between speech
+    changes = np.flatnonzero(np.diff(speech.astype(np.int8)))
+    edges = np.concatenate([[0], changes + 1, [len(speech)]])
+    for a, b in zip(edges[:-1], edges[1:]):
+        if not speech[a] and a > 0 and b < len(speech) and b - a < min_silence_frames:
+            speech[a:b] = True
+    return speech
+
+def mask_to_spans(mask: np.ndarray, frame_seconds: float, duration: float) -> List[Tuple[float, float]]:
+    changes = np.flatnonzero(np.diff(np.concatenate([[0], mask.astype(np.int8), [0]])))
+    spans = []
+    for a, b in zip(changes[::2], changes[1::2]):
+        spans.append((float(a * frame_seconds), float(min(duration, b * frame_seconds))))
+    # The partial frame at the end follows the last full frame
+    if spans and len(mask) and mask[-1]:
+        spans[-1] = (spans[-1][0], duration)
+    return spans
+
+def trim_silence(wav_path: str, output_path: str, frame_ms: int, energy_threshold_db: float,
+                 zcr_threshold: float, min_silence_ms: int, padding_ms: int) -> Optional[TimeMap]:
+    """Write only the speech spans of a 16-bit PCM WAV to output_path.
+
+    Features are computed block by block and the kept spans are copied in a
+    second pass, so memory does not grow with the recording. Returns the time map
+    of the kept audio, or None if nothing but silence was found.
+    """
+    with wave.open(wav_path, 'rb') as w:
+        if w.getsampwidth() != 2:
+            raise ValueError("Silence trimming needs 16-bit PCM")
+        rate = w.getframerate()
+        channels = w.getnchannels()
+        total_frames = w.getnframes()
+        frame_len = max(1, int(rate * frame_ms / 1000))
+        block = (rate * BLOCK_SECONDS // frame_len) * frame_len
+        energies, zcrs = [], []
+        while True:
+            data = w.readframes(block)
+            if not data:
+                break
+            samples = np.frombuffer(data, dtype='<i2').reshape(-1, channels).mean(axis=1)
+            energy_db, zcr = frame_features(samples, frame_len)
+            energies.append(energy_db)
+            zcrs.append(zcr)
+
+    if not energies:
+        return None
+    frame_seconds = frame_len / float(rate)
+    mask = speech_mask(
+        np.concatenate(energies), np.concatenate(zcrs), energy_threshold_db, zcr_threshold,
+        int(padding_ms / 1000.0 / frame_seconds), int(min_silence_ms / 1000.0 / frame_seconds)
+    )
+    spans = mask_to_spans(mask, frame_seconds, total_frames / float(rate))
+    if not spans:
+        return None
+
+    with wave.open(wav_path, 'rb') as src, wave.open(output_path, 'wb') as out:
+        out.setparams(src.getparams())
+        for start, end in spans:
+            src.setpos(int(round(start * rate)))
+            remaining = int(round(end * rate)) - int(round(start * rate))
+            while remaining > 0:
+                data = src.readframes(min(block, remaining))
+                if not data:
+                    break
+                out.writeframes(data)
+                remaining -= len(data) // (2 * channels)
+    return TimeMap(spans)
@@ -0,0 +1,100 @@
+"""Pipeline worker process: runs queued transcription and insight jobs.
+
+It also queues a recording retention sweep every RECORDING_JANITOR_INTERVAL_SECONDS.
+
+Start with `python -m app.worker`. Web workers only enqueue jobs, so the
+heavy media and LLM work here does not compete with request latency.
+"""
+import asyncio
+import logging
+import signal
+from typing import Optional
+from app.config import settings
+from app.db import async_engine, engine
+from app.models.pipeline_job import PipelineJob
+from app.services.insight_backfill import insight_backfiller
+from app.services.insight_generator import generate_insights_for_meeting
+from app.migrations import require_current
+from app.services.job_queue import PipelineWorker, job_queue
+from app.services.recording_janitor import recording_janitor
+from app.services.stt_backends import close_stt_backend
+from app.services.transcode_executor import transcode_executor
+from app.services.transcription_service import get_transcript_text, transcribe_and_save
+from app.utils.llm_client import close_llm_client
+from app.services.read_cache import read_cache
+
+logger = logging.getLogger(__name__)
+
+async def run_transcription(job: PipelineJob) -> Optional[dict]:
+    """Transcribe a meeting's stored recording, or the uploaded file in the job payload."""
+    transcription = await transcribe_and_save(job.meeting_id, job.payload.get("audio_path"))
+    if transcription is None:
+        raise RuntimeError("Transcription failed")
+    return {
+        "transcription_id": transcription.id,
+        "content_length": len(transcription.content)
+    }
+
+async def run_insights(job: PipelineJob) -> Optional[dict]:
+    """Generate insights for a meeting; shares a generation already running elsewhere."""
+    insight = await generate_insights_for_meeting(job.meeting_id, bool(job.payload.get("live_summary")))
+    if insight is None:
+        if not (await get_transcript_text(job.meeting_id)).strip():
+            # Nothing to summarize; retrying would fail the same way
+            return {"insight_id": None, "skipped": "empty transcript"}
+        raise RuntimeError("Insight generation failed")
+    return {"insight_id": insight.id}
+
+async def run_backfill(job: PipelineJob) -> Optional[dict]:
+    """Regenerate insights for the meetings of a backfill run, resuming from its cursor."""
+    run_id = job.payload["backfill_id"]
+    await insight_backfiller.run(run_id)
+    return await insight_backfiller.progress(await insight_backfiller.get(run_id))
+
+async def run_recording_sweep(job: PipelineJob) -> Optional[dict]:
+    """Apply recording retention, archival and disk quota; the result is the reclaimed-bytes report."""
+    return await recording_janitor.sweep(job.payload.get("dry_run", False))
+
+HANDLERS = {
+    "transcribe": run_transcription,
+    "insights": run_insights,
+    "backfill": run_backfill,
+    "janitor": run_recording_sweep,
+}
+
+def build_worker() -> PipelineWorker:
+    return PipelineWorker(
+        job_queue,
+        HANDLERS,
+        {
+            "transcribe": settings.JOB_TRANSCRIBE_CONCURRENCY,
+            "insights": settings.JOB_INSIGHTS_CONCURRENCY,
+            "backfill": settings.JOB_BACKFILL_CONCURRENCY,
+            "janitor": settings.JOB_JANITOR_CONCURRENCY,
+        },
+        settings.JOB_POLL_SECONDS
+    )
+
+async def run():
+    require_current(engine)
+    worker = build_worker()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    janitor = None
+    if settings.RECORDING_JANITOR_ENABLED:
+        janitor = asyncio.create_task(recording_janitor.schedule(settings.RECORDING_JANITOR_INTERVAL_SECONDS))
+    try:
+        await worker.run()
+    finally:
+        if janitor:
+            janitor.cancel()
+        await transcode_executor.shutdown()
+        await close_stt_backend()
+        await close_llm_client()
+        await read_cache.close()
+        await async_engine.dispose()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run())
@@ -1,2 +1,4 @@
 #!/bin/sh
+set -e
+python -m app.migrations upgrade
 uvicorn app.main:app --host 0.0.0.0 --port ${PORT:-8000}
\ No newline at end of file